@@ -17,12 +17,45 @@
 # Ethan Henderson
 # parafoxia@carberra.xyz
 
+from argparse import ArgumentParser
+
 from solaris import Bot, __version__
+from solaris.db import archive
+
+
+async def run_archive(bot, args):
+    await bot.db.connect()
+
+    try:
+        if args.command == "export":
+            counts = await archive.export_guild(bot.db, args.guild_id, args.path)
+            print(f"Exported {sum(counts.values()):,} row(s) for guild {args.guild_id} to {args.path}.")
+        else:
+            guild_id, counts = await archive.import_guild(bot.db, args.path)
+            print(f"Imported {sum(counts.values()):,} row(s) for guild {guild_id} from {args.path}.")
+    except archive.ArchiveError as exc:
+        print(f"Could not {args.command} the archive: {exc}.")
+    finally:
+        await bot.db.close()
 
 
 def main():
+    parser = ArgumentParser(prog="solaris")
+    subparsers = parser.add_subparsers(dest="command")
+    export_parser = subparsers.add_parser("export", help="export one guild's data to an archive")
+    export_parser.add_argument("guild_id", type=int)
+    export_parser.add_argument("path", help="ends in .db3 for an SQLite archive, otherwise gzipped NDJSON")
+    import_parser = subparsers.add_parser("import", help="replace one guild's data with the contents of an archive")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
     bot = Bot(__version__)
-    bot.run()
+
+    if args.command is None:
+        bot.run()
+    else:
+        # The bot should not be running while data is imported.
+        bot.loop.run_until_complete(run_archive(bot, args))
 
 
 if __name__ == "__main__":
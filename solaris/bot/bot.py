@@ -42,6 +42,9 @@ class Bot(commands.Bot):
         self.db = Database(self)
         self.embed = utils.EmbedConstructor(self)
         self.emoji = utils.EmojiGetter(self)
+        self.gate_messages = utils.GateMessageCache(self)
+        self.jobs = utils.JobManager(self)
+        self.member_search = utils.MemberSearch(self)
         self.loc = utils.CodeCounter()
         self.presence = utils.PresenceSetter(self)
         self.ready = utils.Ready(self)
@@ -117,6 +120,33 @@ class Bot(commands.Bot):
 
         await self.presence.set()
 
+    async def on_member_join(self, member):
+        self.member_search.add(member)
+
+    async def on_member_remove(self, member):
+        self.member_search.remove(member)
+
+    async def on_member_update(self, before, after):
+        self.member_search.update(before, after)
+
+    async def on_user_update(self, before, after):
+        self.member_search.update_user(before, after)
+
+    async def on_guild_remove(self, guild):
+        self.member_search.drop(guild.id)
+        self.gate_messages.discard(guild.id)
+
+    async def on_raw_message_delete(self, payload):
+        self.gate_messages.discard(payload.guild_id, payload.message_id)
+
+    async def on_raw_bulk_message_delete(self, payload):
+        for message_id in payload.message_ids:
+            self.gate_messages.discard(payload.guild_id, message_id)
+
+    async def on_raw_message_edit(self, payload):
+        if (guild_id := payload.data.get("guild_id")) is not None:
+            self.gate_messages.discard(int(guild_id), payload.message_id)
+
     async def on_error(self, err, *args, **kwargs):
         error = self.get_cog("Error")
         await error.error(err, *args, **kwargs)
@@ -127,7 +157,7 @@ class Bot(commands.Bot):
 
     async def prefix(self, guild):
         if guild is not None:
-            return await self.db.field("SELECT Prefix FROM system WHERE GuildID = ?", guild.id)
+            return (await self.db.settings.get(guild.id)).system.prefix
 
     async def command_prefix(self, bot, msg):
         prefix = await self.prefix(msg.guild)
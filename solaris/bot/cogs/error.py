@@ -153,18 +153,14 @@ class Error(commands.Cog):
             cause = f"{obj!r}"
 
         ref = self.bot.generate_id()
-        await self.bot.db.execute(
-            "INSERT INTO errors (Ref, Cause, Traceback) VALUES (?, ?, ?)", ref, cause, format_exc()
-        )
+        await self.bot.db.q.add_error(ref, cause, format_exc())
         return ref
 
     @commands.command(name="recallerror", aliases=["err"])
     @commands.is_owner()
     @commands.bot_has_permissions(send_messages=True, attach_files=True)
     async def recallerror_command(self, ctx, ref: str):
-        cause, error_time, traceback = await self.bot.db.record(
-            "SELECT Cause, ErrorTime, Traceback FROM errors WHERE Ref = ?", ref
-        )
+        cause, error_time, traceback = await self.bot.db.q.error(ref)
 
         path = f"{self.bot._dynamic}/{ref}.txt"
         async with aiofiles.open(path, "w", encoding="utf-8") as f:
@@ -18,16 +18,51 @@
 # parafoxia@carberra.xyz
 
 import datetime as dt
+import json
 import typing as t
+from asyncio import Event, Semaphore, TimeoutError, create_task, gather, get_running_loop, wait_for
 from collections import defaultdict
+from heapq import heapify, heappop, heappush
+from math import ceil
+from time import time
 
 import discord
-from apscheduler.triggers.cron import CronTrigger
 from discord.ext import commands
 
-from solaris.utils import checks, chron, string, trips
+from solaris import Config
+from solaris.utils import bulk, checks, chron, string, trips
 
 MODULE_NAME = "gateway"
+# How many timed out members can be kicked from one guild at once.
+KICK_CONCURRENCY: t.Final = 5
+# Discord returns at most this many reaction users per request.
+REACTION_PAGE_SIZE: t.Final = 100
+SYNC_MEMBERS_JOB: t.Final = "sync-members"
+SYNC_REACTIONS_JOB: t.Final = "sync-reactions"
+# Seconds a sync checkpoint can be resumed from after it was last saved.
+SYNC_CHECKPOINT_TTL: t.Final = 3600
+# Seconds to collect departures for before their reactions are cleaned up.
+CLEANUP_DELAY: t.Final = 10
+
+
+async def _reported(bot, coro, event):
+    # Errors in background tasks are reported the same way as errors in
+    # event handlers.
+    try:
+        await coro
+    except Exception:
+        try:
+            await bot.on_error(event)
+        except Exception:
+            pass
+
+
+def _spawn(bot, tasks, coro, event):
+    # A reference is kept until the task is done, so it can't be garbage
+    # collected part way through.
+    tasks.add(task := create_task(_reported(bot, coro, event)))
+    task.add_done_callback(tasks.discard)
+    return task
 
 
 class Okay:
@@ -43,13 +78,13 @@ class Okay:
         else:
             return True
 
-    async def gate_message(self, rc_id, gm_id):
+    async def gate_message(self, rc_id, gm_id, fresh=False):
         try:
             if (rc := self.bot.get_channel(rc_id)) is None:
                 await trips.gateway(self, "the rules channel no longer exists, or is unable to be accessed by Solaris")
             else:
                 # This is done here to ensure the correct order of operations.
-                gm = await rc.fetch_message(gm_id)
+                gm = await self.bot.gate_messages.get(rc, gm_id, fresh)
 
                 if not rc.permissions_for(self.guild.me).manage_messages:
                     await trips.gateway(
@@ -72,8 +107,8 @@ class Okay:
             return br
 
     async def member_roles(self, mr_ids):
-        if mr_ids is not None:
-            for r in (mrs := [self.guild.get_role(int(id_)) for id_ in mr_ids.split(",")]) :
+        if mr_ids:
+            for r in (mrs := [self.guild.get_role(id_) for id_ in mr_ids]):
                 if r is None:
                     await trips.gateway(
                         self, "one or more member roles no longer exist, or are unable to be accessed by Solaris"
@@ -89,8 +124,8 @@ class Okay:
             return mrs
 
     async def exception_roles(self, er_ids):
-        if er_ids is not None:
-            for r in (ers := [self.guild.get_role(int(id_)) for id_ in er_ids.split(",")]) :
+        if er_ids:
+            for r in (ers := [self.guild.get_role(id_) for id_ in er_ids]):
                 if r is None:
                     await trips.gateway(
                         self, "one or more exception roles no longer exist, or are unable to be accessed by Solaris"
@@ -123,129 +158,466 @@ class Okay:
 
 
 class Synchronise:
+    # Reaction users are streamed from Discord a page at a time and each page
+    # is acted on as it arrives, so memory use doesn't grow with the number
+    # of reactions. Progress is checkpointed in the jobs table after every
+    # page, so an interrupted sync picks up where it left off.
     def __init__(self, bot):
         self.bot = bot
 
-    async def _allow(self, okay, member, br_id, mr_ids):
-        if (mrs := await okay.member_roles(mr_ids)) and (unassigned := set(mrs) - set(member.roles)):
-            await member.add_roles(
-                *list(unassigned),
-                reason="Member accepted the server rules (performed during synchronisation).",
-                atomic=False,
-            )
+    @staticmethod
+    async def _pages(reaction, after):
+        page = []
+
+        async for user in reaction.users(after=discord.Object(id=after) if after else None):
+            page.append(user.id)
+
+            if len(page) == REACTION_PAGE_SIZE:
+                yield page
+                page = []
+
+        if page:
+            yield page
+
+    async def _checkpoint(self, guild, gm, kind, resume):
+        # Only a recent checkpoint for the same gate message is carried on
+        # from. Anything else may be missing changes made since, so the
+        # sync starts over.
+        if resume and (job := await self.bot.db.q.job(guild.id, kind)) is not None and job[0] == gm.id:
+            _, cursor, checked, changed, options = job
+            options = json.loads(options or "{}")
+
+            if time() - options.get("saved", 0) < SYNC_CHECKPOINT_TTL:
+                return options, cursor, checked, changed
+
+        await self.bot.db.q.add_job(guild.id, kind, gm.channel.id, gm.id, 0, 0, 0, json.dumps({"saved": time()}))
+        return {}, 0, 0, 0
+
+    async def _stream(self, guild, gm, kind, handle, state=None, resume=False):
+        # Feeds each page of tick then cross reactions to `handle`. The stage
+        # (which reaction), the last user ID handled, and the sets of IDs
+        # `handle` keeps in `state` are saved after each.
+        state = {} if state is None else state
+        options, cursor, checked, changed = await self._checkpoint(guild, gm, kind, resume)
+
+        for key, ids in state.items():
+            ids.update(options.get(key, ()))
+
+        for stage in range(options.get("stage", 0), 2):
+            async for ids in self._pages(gm.reactions[stage], cursor):
+                changed += await handle(stage, set(ids))
+                checked += len(ids)
+                options = json.dumps({"stage": stage, "saved": time(), **{k: list(v) for k, v in state.items()}})
+                await self.bot.db.q.stage_job(ids[-1], checked, changed, options, guild.id, kind)
+
+            cursor = 0
+
+    async def members(self, guild, okay, gm, br_id, mr_ids, er_ids, last_commit, entrants, accepted, resume=False):
+        entrants = set(entrants)
+        accepted = set(accepted)
+        # Only checked so the module trips if an exception role has gone.
+        er_ids = set(er_ids) if await okay.exception_roles(er_ids) else set()
+
+        present = {m.id: m for m in guild.members}
+        pending = {m.id for m in present.values() if not m.bot and (m.joined_at > last_commit or m.id in entrants)}
+        # Everyone dealt with so far, whether or not that worked. These are
+        # kept in the checkpoint rather than taken from the accepted table,
+        # where a member who left and came back offline may still have a
+        # row, and a resumed sync must not kick those who ticked for also
+        # crossing.
+        allowed = set()
+        denied = set()
+        roles = None
+
+        async def _allow(member):
+            mrs, br = roles
+
+            if unassigned := mrs - set(member.roles):
+                await member.add_roles(
+                    *unassigned,
+                    reason="Member accepted the server rules (performed during synchronisation).",
+                    atomic=False,
+                )
 
-        if (br := await okay.blocking_role(br_id)) in member.roles:
-            await member.remove_roles(
-                br,
-                reason="Member accepted the server rules, or was given an exception role (performed during synchronisation).",
-            )
+            if br in member.roles:
+                await member.remove_roles(
+                    br,
+                    reason="Member accepted the server rules, or was given an exception role (performed during synchronisation).",
+                )
 
-    async def _deny(self, okay, member, br_id):
-        await member.kick(reason="Member declined the server rules (performed during synchronisation).")
-
-    async def members(self, guild, okay, gm, br_id, mr_ids, er_ids, last_commit, entrants, accepted):
-        def _check(m):
-            return not m.bot and (m.joined_at > last_commit or m.id in entrants)
-
-        reacted = []
-        new = []
-        left = []
-
-        ticked = await gm.reactions[0].users().flatten()
-        crossed = await gm.reactions[1].users().flatten()
-        ers = await okay.exception_roles(er_ids) or []
-
-        for member in filter(lambda m: _check(m), guild.members):
-            if member in ticked:
-                await self._allow(okay, member, br_id, mr_ids)
-                reacted.append((guild.id, member.id))
-                new.append((guild.id, member.id))
-            elif member in crossed:
-                await self._deny(okay, member, br_id)
-                reacted.append((guild.id, member.id))
-            elif any(r in member.roles for r in ers):
-                await self._allow(okay, member, br_id, mr_ids)
-                reacted.append((guild.id, member.id))
-
-        for user_id in set([*entrants, *accepted]):
-            if not guild.get_member(user_id):
-                left.append((guild.id, user_id))
-
-        await self.bot.db.executemany("DELETE FROM entrants WHERE GuildID = ? AND UserID = ?", set([*reacted, *left]))
-        await self.bot.db.executemany("DELETE FROM accepted WHERE GuildID = ? AND UserID = ?", set(left))
-        await self.bot.db.executemany("INSERT OR IGNORE INTO accepted VALUES (?, ?)", set(new))
+        async def _deny(member):
+            await member.kick(reason="Member declined the server rules (performed during synchronisation).")
 
-    async def roles(self, guild, okay, br_id, mr_ids, accepted, accepted_only):
-        def _check(m):
-            return not m.bot and (not accepted_only or m.id in accepted)
+        async def _apply(action, ids, accept):
+            nonlocal roles
+            if not ids:
+                return set()
+
+            if action is _allow and roles is None:
+                roles = (set(await okay.member_roles(mr_ids) or ()), await okay.blocking_role(br_id))
+
+            # Anyone who could not be dealt with is left for the timeout to
+            # catch.
+            result = await bulk.run(action, [present[id_] for id_ in ids])
+            synced = [(guild.id, m.id) for m in result.succeeded]
+
+            async with self.bot.db.transaction():
+                await self.bot.db.q.remove_entrant.many(synced)
+                if accept:
+                    await self.bot.db.q.add_accepted.many(synced)
 
+            return {id_ for _, id_ in synced}
+
+        async def _handle(stage, ids):
+            # Ticks are all handled before crosses, so ticking always wins.
+            if stage == 0:
+                allowed.update(ids := (ids & pending) - allowed)
+                return len(await _apply(_allow, ids, True))
+
+            denied.update(ids := (ids & pending) - allowed - denied)
+            return len(await _apply(_deny, ids, False))
+
+        await self._stream(guild, gm, SYNC_MEMBERS_JOB, _handle, {"allowed": allowed, "denied": denied}, resume)
+
+        excepted = {id_ for id_ in pending - allowed - denied if er_ids.intersection(r.id for r in present[id_].roles)}
+        await _apply(_allow, excepted, False)
+
+        left = [(guild.id, id_) for id_ in (entrants | accepted) - present.keys()]
+        async with self.bot.db.transaction():
+            await self.bot.db.q.remove_entrant.many(left)
+            await self.bot.db.q.remove_accepted.many(left)
+            await self.bot.db.q.remove_job(guild.id, SYNC_MEMBERS_JOB)
+
+    async def roles(self, guild, okay, br_id, mr_ids, accepted, accepted_only):
         br = await okay.blocking_role(br_id)
-        mrs = await okay.member_roles(mr_ids)
+        if not (mrs := set(await okay.member_roles(mr_ids) or ())):
+            return
 
-        for member in filter(lambda m: _check(m), guild.members):
-            if br not in member.roles and (unassigned := set(mrs) - set(member.roles)):
-                await member.add_roles(
-                    *list(unassigned),
-                    reason="Member roles have been updated (performed during synchronisation).",
-                    atomic=False,
-                )
+        accepted = set(accepted)
+        todo = [
+            m
+            for m in guild.members
+            if not m.bot and (not accepted_only or m.id in accepted) and br not in m.roles and not mrs <= set(m.roles)
+        ]
+
+        async def _assign(member):
+            await member.add_roles(
+                *(mrs - set(member.roles)),
+                reason="Member roles have been updated (performed during synchronisation).",
+                atomic=False,
+            )
 
-    async def reactions(self, guild, gm, accepted):
-        tick = gm.reactions[0]
-        cross = gm.reactions[1]
-        ticked = await tick.users().flatten()
-        crossed = await cross.users().flatten()
-        ticked_and_left = set(ticked) - set(guild.members)
-        crossed_and_left = set(crossed) - set(guild.members)
+        return await bulk.run(_assign, todo)
 
-        for user in ticked_and_left:
-            await gm.remove_reaction(tick.emoji, user)
+    async def reactions(self, guild, gm, accepted, resume=False):
+        accepted = set(accepted)
+        present = {m.id for m in guild.members}
 
-        for user in crossed_and_left:
-            await gm.remove_reaction(cross.emoji, user)
+        async def _handle(stage, ids):
+            stale = ids - present if stage == 0 else (ids - present) | (ids & accepted)
+            emoji = gm.reactions[stage].emoji
+            result = await bulk.run(lambda id_: gm.remove_reaction(emoji, discord.Object(id=id_)), stale)
+            return len(result.succeeded)
 
-        for user in crossed:
-            if user.id in accepted:
-                await gm.remove_reaction(cross.emoji, user)
+        await self._stream(guild, gm, SYNC_REACTIONS_JOB, _handle, resume=resume)
+        await self.bot.db.q.remove_job(guild.id, SYNC_REACTIONS_JOB)
 
-    async def on_boot(self):
-        last_commit = chron.from_iso(await self.bot.db.field("SELECT Value FROM bot WHERE Key = 'last commit'"))
-        records = await self.bot.db.records(
-            "SELECT GuildID, RulesChannelID, GateMessageID, BlockingRoleID, MemberRoleIDs, ExceptionRoleIDs FROM gateway WHERE Active = 1"
-        )
+    async def on_boot(self, syncing, guild_ids):
+        try:
+            await self._on_boot(syncing, guild_ids)
+        finally:
+            # However the sync ends, no guild's events can be left queued.
+            for guild_id in guild_ids:
+                await syncing.finish(guild_id)
+
+    async def _on_boot(self, syncing, guild_ids):
+        last_commit = chron.from_iso(await self.bot.db.q.last_commit())
+        semaphore = Semaphore(max(Config.GATEWAY_SYNC_CONCURRENCY, 1))
 
         entrants = {
             guild_id: [int(user_id) for user_id in user_ids.split(",")]
-            for guild_id, user_ids in await self.bot.db.records(
-                "SELECT GuildID, GROUP_CONCAT(UserID) FROM entrants GROUP BY GuildID"
-            )
+            for guild_id, user_ids in await self.bot.db.q.grouped_entrants()
         }
 
         accepted = {
             guild_id: [int(user_id) for user_id in user_ids.split(",")]
-            for guild_id, user_ids in await self.bot.db.records(
-                "SELECT GuildID, GROUP_CONCAT(UserID) FROM accepted GROUP BY GuildID"
-            )
+            for guild_id, user_ids in await self.bot.db.q.grouped_accepted()
         }
 
-        for guild_id, rc_id, gm_id, br_id, mr_ids, er_ids in records:
+        async def _sync(guild_id):
             guild = self.bot.get_guild(guild_id)
             okay = Okay(self.bot, guild)
+            gateway = (await self.bot.db.settings.get(guild_id)).gateway
 
-            if gm := await okay.gate_message(rc_id, gm_id):
+            if gm := await okay.gate_message(gateway.rules_channel_id, gateway.gate_message_id, fresh=True):
                 await self.members(
                     guild,
                     okay,
                     gm,
-                    br_id,
-                    mr_ids,
-                    er_ids,
+                    gateway.blocking_role_id,
+                    gateway.member_role_ids,
+                    gateway.exception_role_ids,
                     last_commit,
                     entrants.get(guild_id, []),
                     accepted.get(guild_id, []),
+                    resume=True,
                 )
 
-        await self.bot.db.execute("UPDATE entrants SET Timeout = datetime('now', '+3600 seconds')")
+        async def _run(guild_id):
+            async with semaphore:
+                try:
+                    await wait_for(_sync(guild_id), Config.GATEWAY_SYNC_TIMEOUT)
+                except TimeoutError:
+                    # The sync's checkpoint is kept, so a restart soon after
+                    # carries on from here.
+                    print(f" Gateway sync for guild {guild_id} timed out.")
+                except Exception:
+                    try:
+                        await self.bot.on_error("on_boot")
+                    except Exception:
+                        pass
+                finally:
+                    await syncing.finish(guild_id)
+
+        await gather(*(_run(guild_id) for guild_id in guild_ids))
+
+        # Reaction syncs are only started by hand, so only ones that were
+        # interrupted are carried on with.
+        for guild_id, channel_id, message_id, *_ in await self.bot.db.q.jobs_of_kind(SYNC_REACTIONS_JOB):
+            if guild_id in guild_ids and (guild := self.bot.get_guild(guild_id)) is not None:
+                if gm := await Okay(self.bot, guild).gate_message(channel_id, message_id, fresh=True):
+                    await self.reactions(guild, gm, accepted.get(guild_id, []), resume=True)
+            else:
+                await self.bot.db.q.remove_job(guild_id, SYNC_REACTIONS_JOB)
+
+
+class Syncing:
+    # Guilds still being synchronised after boot. Gateway events for them are
+    # held back until their sync finishes, then handled in the order they
+    # arrived.
+    def __init__(self, bot):
+        self.bot = bot
+        self._queues = {}
+
+    def start(self, guild_ids):
+        self._queues.update((guild_id, []) for guild_id in guild_ids)
+
+    def defer(self, guild_id, handler, *args):
+        if (queue := self._queues.get(guild_id)) is None:
+            return False
+
+        queue.append((handler, args))
+        return True
+
+    async def finish(self, guild_id):
+        # Events that arrive while the queue is being worked through are
+        # queued behind it, so nothing jumps ahead.
+        while queue := self._queues.get(guild_id):
+            self._queues[guild_id] = []
+
+            for handler, args in queue:
+                try:
+                    await handler(*args)
+                except Exception:
+                    try:
+                        await self.bot.on_error(handler.__name__, *args)
+                    except Exception:
+                        pass
+
+        self._queues.pop(guild_id, None)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._queues
+
+    def __bool__(self):
+        return bool(self._queues)
+
+
+class ReactionCleanup:
+    # Departed members' reactions are removed in batches rather than as each
+    # one leaves. A small batch is removed directly. For a large one it is
+    # cheaper to page through the reactions once and only remove the ones
+    # that are really there.
+    def __init__(self, bot):
+        self.bot = bot
+        self._departed = defaultdict(set)
+        self._handles = {}
+        self._flushes = set()
+
+    def add(self, guild_id, user_id):
+        self._departed[guild_id].add(user_id)
+
+        if guild_id not in self._handles:
+            self._handles[guild_id] = get_running_loop().call_later(
+                CLEANUP_DELAY, lambda: _spawn(self.bot, self._flushes, self.flush(guild_id), "on_reaction_cleanup")
+            )
+
+    def stop(self):
+        for handle in self._handles.values():
+            handle.cancel()
+        for task in self._flushes:
+            task.cancel()
+
+        self._handles.clear()
+        self._departed.clear()
+
+    async def flush(self, guild_id):
+        self._handles.pop(guild_id, None)
+        departed = self._departed.pop(guild_id, set())
+
+        if (guild := self.bot.get_guild(guild_id)) is None:
+            return
+
+        # Anyone who has already come back keeps their reactions.
+        departed = {id_ for id_ in departed if guild.get_member(id_) is None}
+        gateway = (await self.bot.db.settings.get(guild_id)).gateway
+
+        if not departed or not gateway.active:
+            return
+
+        # A fresh copy, as the cached one's reaction counts aren't kept up to
+        # date.
+        if not (
+            gm := await Okay(self.bot, guild).gate_message(
+                gateway.rules_channel_id, gateway.gate_message_id, fresh=True
+            )
+        ):
+            return
+
+        reactions = gm.reactions[:2]
+        if 2 * len(departed) <= sum(ceil(r.count / REACTION_PAGE_SIZE) for r in reactions):
+            stale = [(emoji, id_) for emoji in self.bot.emoji.get_many("confirm", "cancel") for id_ in departed]
+        else:
+            stale = []
+            for reaction in reactions:
+                async for ids in Synchronise._pages(reaction, 0):
+                    stale.extend((reaction.emoji, id_) for id_ in departed.intersection(ids))
+
+        await bulk.run(lambda target: gm.remove_reaction(target[0], discord.Object(id=target[1])), stale)
+
+
+class BotCounts:
+    # Bots per guild, kept up to date from member events so templating a
+    # welcome or goodbye message doesn't mean counting the whole guild.
+    def __init__(self):
+        self._bots = {}
+
+    def load(self, guilds):
+        self._bots = {guild.id: sum(1 for m in guild.members if m.bot) for guild in guilds}
+
+    def add(self, member):
+        if member.bot and member.guild.id in self._bots:
+            self._bots[member.guild.id] += 1
+
+    def remove(self, member):
+        if member.bot and member.guild.id in self._bots:
+            self._bots[member.guild.id] -= 1
+
+    def drop(self, guild_id):
+        self._bots.pop(guild_id, None)
+
+    def bots(self, guild):
+        if (count := self._bots.get(guild.id)) is None:
+            count = self._bots[guild.id] = sum(1 for m in guild.members if m.bot)
+
+        return count
+
+
+class Timeouts:
+    # Entrant deadlines are kept in a min-heap so each member is kicked as
+    # soon as their time is up. Entries are not removed from the heap when a
+    # member accepts or leaves; they are skipped when they surface instead.
+    def __init__(self, bot):
+        self.bot = bot
+        self._heap = []
+        self._deadlines = {}
+        self._wakeup = Event()
+        self._limits = defaultdict(lambda: Semaphore(KICK_CONCURRENCY))
+        self._task = None
+        self._expiring = set()
+
+    async def load(self):
+        self._deadlines.clear()
+
+        for guild_id, user_id, timeout in await self.bot.db.q.entrant_timeouts():
+            self._deadlines[(guild_id, user_id)] = chron.from_iso(timeout)
+
+        self._heap = [(deadline, *key) for key, deadline in self._deadlines.items()]
+        heapify(self._heap)
+        self._wakeup.set()
+
+    async def load_guild(self, guild_id):
+        # Replaces one guild's deadlines with what is stored, such as after
+        # its data has been imported. Dropped entries go stale in the heap.
+        for key in [key for key in self._deadlines if key[0] == guild_id]:
+            del self._deadlines[key]
+
+        for user_id, timeout in await self.bot.db.q.guild_entrant_timeouts(guild_id):
+            self.add(guild_id, user_id, chron.from_iso(timeout))
+
+    def start(self):
+        if self._task is None:
+            self._task = create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        for task in self._expiring:
+            task.cancel()
+
+    def add(self, guild_id, user_id, deadline):
+        self._deadlines[(guild_id, user_id)] = deadline
+        heappush(self._heap, (deadline, guild_id, user_id))
+
+        if self._heap[0][0] == deadline:
+            self._wakeup.set()
+
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            # Too many stale entries; rebuild from the live ones.
+            self._heap = [(deadline, *key) for key, deadline in self._deadlines.items()]
+            heapify(self._heap)
+
+    def discard(self, guild_id, user_id):
+        self._deadlines.pop((guild_id, user_id), None)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = dt.datetime.utcnow()
+
+            while self._heap and self._heap[0][0] <= now:
+                deadline, guild_id, user_id = heappop(self._heap)
+
+                if self._deadlines.get((guild_id, user_id)) == deadline:
+                    del self._deadlines[(guild_id, user_id)]
+                    _spawn(self.bot, self._expiring, self._expire(guild_id, user_id), "on_timeout")
+
+            try:
+                await wait_for(self._wakeup.wait(), (self._heap[0][0] - now).total_seconds() if self._heap else None)
+            except TimeoutError:
+                pass
+
+    async def _expire(self, guild_id, user_id):
+        async with self._limits[guild_id]:
+            gateway = (await self.bot.db.settings.get(guild_id)).gateway
+
+            # Anything could have happened since the deadline was set, so
+            # only kick if the member is still waiting on a decision.
+            if (
+                not gateway.active
+                or (guild := self.bot.get_guild(guild_id)) is None
+                or (member := guild.get_member(user_id)) is None
+                or not await self.bot.db.buffer.exists("entrants", guild_id, user_id)
+            ):
+                return
+
+            if await Okay(self.bot, guild).blocking_role(gateway.blocking_role_id) in member.roles:
+                try:
+                    await member.kick(reason="Member failed to accept the server rules before being timed out.")
+                except discord.NotFound:
+                    pass
 
 
 class Gateway(commands.Cog):
@@ -253,153 +625,153 @@ class Gateway(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.bot.scheduler.add_job(self.remove_on_timeout, CronTrigger(second=0))
+        self.timeouts = Timeouts(bot)
+        self.bot_counts = BotCounts()
+        self.syncing = Syncing(bot)
+        self.reaction_cleanup = ReactionCleanup(bot)
+        self._tasks = set()
+        self.templates = string.TemplateCache(string.MEMBER_VARIABLES)
         self.configurable = True
 
+    def cog_unload(self):
+        self.timeouts.stop()
+        self.reaction_cleanup.stop()
+
+        for task in self._tasks:
+            task.cancel()
+
     @commands.Cog.listener()
     async def on_ready(self):
         if not self.bot.ready.booted:
-            await Synchronise(self.bot).on_boot()
+            self.bot_counts.load(self.bot.guilds)
+            await self.bot.db.q.reset_entrant_timeouts()
+            await self.timeouts.load()
+            self.timeouts.start()
+
+            # Guilds are synchronised in the background; until each one is
+            # done, its events are queued rather than handled.
+            self.syncing.start(guild_ids := await self.bot.db.q.active_gateways())
+            _spawn(self.bot, self._tasks, Synchronise(self.bot).on_boot(self.syncing, guild_ids), "on_boot")
             self.bot.ready.up(self)
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot_counts.drop(guild.id)
+        self.templates.drop(guild.id)
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        if self.bot.ready.gateway:
-            okay = Okay(self.bot, member.guild)
-            active, br_id, wc_id, timeout, wbt = (
-                await self.bot.db.record(
-                    "SELECT Active, BlockingRoleID, WelcomeChannelID, Timeout, WelcomeBotText FROM gateway WHERE GuildID = ?",
-                    member.guild.id,
-                )
-                or [None] * 7
-            )
+        self.bot_counts.add(member)
 
-            if active and await okay.permissions():
-                if member.bot:
-                    if wc := await okay.welcome_channel(wc_id):
-                        await wc.send(
-                            self.format_custom_message(wbt, member)
-                            or f"‎The bot {member.mention} was added to the server."
-                        )
-                else:
-                    if br := await okay.blocking_role(br_id):
-                        await member.add_roles(br, reason="Needed to enforce a decision on the server rules.")
-                        await self.bot.db.execute(
-                            "INSERT INTO entrants VALUES (?, ?, ?)",
-                            member.guild.id,
-                            member.id,
-                            chron.to_iso(member.joined_at + dt.timedelta(seconds=timeout or 300)),
-                        )
+        if self.bot.ready.gateway and not self.syncing.defer(member.guild.id, self.handle_join, member):
+            await self.handle_join(member)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-        if self.bot.ready.gateway:
-            okay = Okay(self.bot, member.guild)
-            active, rc_id, gm_id, gc_id, gt, gbt = (
-                await self.bot.db.record(
-                    "SELECT Active, RulesChannelID, GateMessageID, GoodbyeChannelID, GoodbyeText, GoodbyeBotText FROM gateway WHERE GuildID = ?",
-                    member.guild.id,
-                )
-                or [None] * 4
-            )
+        self.bot_counts.remove(member)
 
-            if active:
-                if member.bot:
-                    if gc := await okay.goodbye_channel(gc_id):
-                        await gc.send(
-                            self.format_custom_message(gbt, member)
-                            or f'‎The bot "{member.display_name}" was removed from the server.'
-                        )
-                else:
-                    if await self.bot.db.field(
-                        "SELECT UserID FROM entrants WHERE GuildID = ? AND UserID = ?", member.guild.id, member.id
-                    ):
-                        await self.bot.db.execute(
-                            "DELETE FROM entrants WHERE GuildID = ? AND UserID = ?", member.guild.id, member.id
-                        )
-                    elif gc := await okay.goodbye_channel(gc_id):
-                        await gc.send(
-                            self.format_custom_message(gt, member)
-                            or f"‎{member.display_name} is no longer in the server."
-                        )
+        if self.bot.ready.gateway and not self.syncing.defer(member.guild.id, self.handle_remove, member):
+            await self.handle_remove(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if (
+            self.bot.ready.gateway
+            and len(after.roles) > len(before.roles)
+            and not self.syncing.defer(after.guild.id, self.handle_update, before, after)
+        ):
+            await self.handle_update(before, after)
 
-                    await self.bot.db.execute(
-                        "DELETE FROM accepted WHERE GuildID = ? AND UserID = ?", member.guild.id, member.id
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        if self.bot.ready.gateway and not self.syncing.defer(payload.guild_id, self.handle_reaction, payload):
+            await self.handle_reaction(payload)
+
+    async def handle_join(self, member):
+        okay = Okay(self.bot, member.guild)
+        gateway = (await self.bot.db.settings.get(member.guild.id)).gateway
+
+        if gateway.active and await okay.permissions():
+            if member.bot:
+                if wc := await okay.welcome_channel(gateway.welcome_channel_id):
+                    await wc.send(
+                        self.format_custom_message("welcome_bot_text", gateway.welcome_bot_text, member)
+                        or f"‎The bot {member.mention} was added to the server."
+                    )
+            else:
+                if br := await okay.blocking_role(gateway.blocking_role_id):
+                    await member.add_roles(br, reason="Needed to enforce a decision on the server rules.")
+                    deadline = member.joined_at + dt.timedelta(seconds=gateway.timeout or 300)
+                    await self.bot.db.buffer.upsert("entrants", member.guild.id, member.id, chron.to_iso(deadline))
+                    self.timeouts.add(member.guild.id, member.id, deadline)
+
+    async def handle_remove(self, member):
+        okay = Okay(self.bot, member.guild)
+        gateway = (await self.bot.db.settings.get(member.guild.id)).gateway
+
+        if gateway.active:
+            if member.bot:
+                if gc := await okay.goodbye_channel(gateway.goodbye_channel_id):
+                    await gc.send(
+                        self.format_custom_message("goodbye_bot_text", gateway.goodbye_bot_text, member)
+                        or f'‎The bot "{member.display_name}" was removed from the server.'
+                    )
+            else:
+                self.timeouts.discard(member.guild.id, member.id)
+
+                if await self.bot.db.buffer.exists("entrants", member.guild.id, member.id):
+                    await self.bot.db.buffer.delete("entrants", member.guild.id, member.id)
+                elif gc := await okay.goodbye_channel(gateway.goodbye_channel_id):
+                    await gc.send(
+                        self.format_custom_message("goodbye_text", gateway.goodbye_text, member)
+                        or f"‎{member.display_name} is no longer in the server."
                     )
 
-                    if (gm := await okay.gate_message(rc_id, gm_id)) :
-                        for emoji in self.bot.emoji.get_many("confirm", "cancel"):
-                            try:
-                                await gm.remove_reaction(emoji, member)
-                            except discord.NotFound:
-                                # In the rare instance the module trips while attempting to remove a reaction.
-                                pass
+                await self.bot.db.buffer.delete("accepted", member.guild.id, member.id)
+                self.reaction_cleanup.add(member.guild.id, member.id)
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before, after):
-        if self.bot.ready.gateway and len(after.roles) > len(before.roles):
-            okay = Okay(self.bot, after.guild)
-            active, br_id, mr_ids, er_ids = (
-                await self.bot.db.record(
-                    "SELECT Active, BlockingRoleID, MemberRoleIDs, ExceptionRoleIDs FROM gateway WHERE GuildID = ?",
-                    after.guild.id,
-                )
-                or [None] * 4
-            )
+    async def handle_update(self, before, after):
+        okay = Okay(self.bot, after.guild)
+        gateway = (await self.bot.db.settings.get(after.guild.id)).gateway
 
-            if active and er_ids:
-                added_role = (set(after.roles) - set(before.roles)).pop()
+        if gateway.active and gateway.exception_role_ids:
+            added_role = (set(after.roles) - set(before.roles)).pop()
 
-                ers = await okay.exception_roles(er_ids)
-                if ers is not None and added_role in ers:
-                    await self.allow_on_exception(after, okay, br_id, mr_ids)
+            if added_role.id in gateway.exception_role_ids:
+                await self.allow_on_exception(after, okay, gateway.blocking_role_id, gateway.member_role_ids)
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload):
-        if self.bot.ready.gateway:
-            okay = Okay(self.bot, payload.member.guild)
-            active, rc_id, gm_id, br_id, mr_ids, wc_id, wt = (
-                await self.bot.db.record(
-                    "SELECT Active, RulesChannelID, GateMessageID, BlockingRoleID, MemberRoleIDs, WelcomeChannelID, WelcomeText FROM gateway WHERE GuildID = ?",
-                    payload.guild_id,
-                )
-                or [None] * 7
-            )
+    async def handle_reaction(self, payload):
+        okay = Okay(self.bot, payload.member.guild)
+        gateway = (await self.bot.db.settings.get(payload.guild_id)).gateway
 
-            if active and payload.message_id == gm_id and (gm := await okay.gate_message(rc_id, gm_id)):
-                if payload.emoji.id == self.bot.emoji.get("confirm").id:
-                    await self.allow_on_accept(payload.member, okay, br_id, mr_ids, wc_id, wt)
-                elif payload.emoji.id == self.bot.emoji.get("cancel").id:
-                    await self.remove_on_decline(payload.member, okay, br_id)
+        if (
+            gateway.active
+            and payload.message_id == gateway.gate_message_id
+            and (gm := await okay.gate_message(gateway.rules_channel_id, gateway.gate_message_id))
+        ):
+            if payload.emoji.id == self.bot.emoji.get("confirm").id:
+                await self.allow_on_accept(
+                    payload.member,
+                    okay,
+                    gateway.blocking_role_id,
+                    gateway.member_role_ids,
+                    gateway.welcome_channel_id,
+                    gateway.welcome_text,
+                )
+            elif payload.emoji.id == self.bot.emoji.get("cancel").id:
+                await self.remove_on_decline(payload.member, okay, gateway.blocking_role_id)
 
-    @staticmethod
-    def format_custom_message(text, member):
+    def format_custom_message(self, name, text, member):
         if text:
-            bot_count = len([m for m in member.guild.members if m.bot])
-            human_count = member.guild.member_count - bot_count
+            try:
+                template = self.templates.get(member.guild.id, name, text)
+            except string.TemplateError:
+                # Set before templates were validated this strictly, so the
+                # default message is used instead.
+                return None
 
             # Contains U+200E character.
-            return "‎" + string.safe_format(
-                text,
-                membername=member.name,
-                username=member.name,
-                membermention=member.mention,
-                usermention=member.mention,
-                memberstr=str(member),
-                userstr=str(member),
-                memberid=member.id,
-                userid=member.id,
-                servername=member.guild.name,
-                guildname=member.guild.name,
-                serverid=member.guild.id,
-                guildid=member.guild.id,
-                membercount=member.guild.member_count,
-                ordmembercount=string.ordinal(member.guild.member_count),
-                humancount=human_count,
-                ordhumancount=string.ordinal(human_count),
-                botcount=bot_count,
-                ordbotcount=string.ordinal(bot_count),
-            )
+            return "‎" + template.render(member, lambda: self.bot_counts.bots(member.guild))
 
     async def allow_on_accept(self, member, okay, br_id, mr_ids, wc_id, wt):
         if (br := await okay.blocking_role(br_id)) in member.roles:
@@ -409,15 +781,14 @@ class Gateway(commands.Cog):
 
             if wc := await okay.welcome_channel(wc_id):
                 await wc.send(
-                    self.format_custom_message(wt, member)
+                    self.format_custom_message("welcome_text", wt, member)
                     or f"‎{member.mention} joined the server and accepted the rules. Welcome!"
                 )
 
-            await self.bot.db.execute(
-                "DELETE FROM entrants WHERE GuildID = ? AND UserID = ?", member.guild.id, member.id
-            )
+            await self.bot.db.buffer.delete("entrants", member.guild.id, member.id)
+            self.timeouts.discard(member.guild.id, member.id)
 
-        await self.bot.db.execute("INSERT OR IGNORE INTO accepted VALUES (?, ?)", member.guild.id, member.id)
+        await self.bot.db.buffer.upsert("accepted", member.guild.id, member.id)
 
     async def remove_on_decline(self, member, okay, br_id):
         if (br := await okay.blocking_role(br_id)) in member.roles:
@@ -429,28 +800,8 @@ class Gateway(commands.Cog):
                 await member.add_roles(*list(unassigned), reason="Member was given an exception role.", atomic=False)
             await member.remove_roles(br, reason="Member was given an exception role.")
 
-            await self.bot.db.execute(
-                "DELETE FROM entrants WHERE GuildID = ? AND UserID = ?", member.guild.id, member.id
-            )
-
-    async def remove_on_timeout(self):
-        if self.bot.ready.gateway:
-            time_outs = {}
-
-            for guild_id, user_id in await self.bot.db.records(
-                "SELECT GuildID, UserID FROM entrants WHERE CURRENT_TIMESTAMP > Timeout"
-            ):
-                time_outs.setdefault(guild_id, []).append(user_id)
-
-            for guild_id, user_ids in time_outs.items():
-                guild = self.bot.get_guild(guild_id)
-                br = await Okay(self.bot, guild).blocking_role(
-                    await self.bot.db.field("SELECT BlockingRoleID FROM gateway WHERE GuildID = ?", guild_id)
-                )
-
-                for user_id in user_ids:
-                    if br in (member := guild.get_member(user_id)).roles:
-                        await member.kick(reason="Member failed to accept the server rules before being timed out.")
+            await self.bot.db.buffer.delete("entrants", member.guild.id, member.id)
+            self.timeouts.discard(member.guild.id, member.id)
 
     @commands.group(
         name="synchronise",
@@ -500,18 +851,19 @@ class Gateway(commands.Cog):
     async def synchronise_members_command(self, ctx):
         async with ctx.typing():
             okay = Okay(self.bot, ctx.guild)
+            gateway = (await self.bot.db.settings.get(ctx.guild.id)).gateway
             rc_id, gm_id, br_id, mr_ids, er_ids = (
-                await self.bot.db.record(
-                    "SELECT RulesChannelID, GateMessageID, BlockingRoleID, MemberRoleIDs, ExceptionRoleIDs FROM gateway WHERE GuildID = ?",
-                    ctx.guild.id,
-                )
-                or [None] * 5
+                gateway.rules_channel_id,
+                gateway.gate_message_id,
+                gateway.blocking_role_id,
+                gateway.member_role_ids,
+                gateway.exception_role_ids,
             )
-            last_commit = chron.from_iso(await self.bot.db.field("SELECT Value FROM bot WHERE Key = 'last commit'"))
-            entrants = await self.bot.db.column("SELECT UserID FROM entrants WHERE GuildID = ?", ctx.guild.id)
-            accepted = await self.bot.db.column("SELECT UserID FROM accepted WHERE GuildID = ?", ctx.guild.id)
+            last_commit = chron.from_iso(await self.bot.db.q.last_commit())
+            entrants = await self.bot.db.q.entrant_ids(ctx.guild.id)
+            accepted = await self.bot.db.q.accepted_ids(ctx.guild.id)
 
-            if gm := await okay.gate_message(rc_id, gm_id):
+            if gm := await okay.gate_message(rc_id, gm_id, fresh=True):
                 await Synchronise(self.bot).members(
                     ctx.guild, okay, gm, br_id, mr_ids, er_ids, last_commit, entrants, accepted
                 )
@@ -529,13 +881,9 @@ class Gateway(commands.Cog):
     async def synchronise_roles_command(self, ctx, accepted_only: t.Optional[bool] = True):
         async with ctx.typing():
             okay = Okay(self.bot, ctx.guild)
-            br_id, mr_ids = (
-                await self.bot.db.record(
-                    "SELECT BlockingRoleID, MemberRoleIDs FROM gateway WHERE GuildID = ?", ctx.guild.id,
-                )
-                or [None] * 2
-            )
-            accepted = await self.bot.db.column("SELECT UserID FROM accepted WHERE GuildID = ?", ctx.guild.id)
+            gateway = (await self.bot.db.settings.get(ctx.guild.id)).gateway
+            br_id, mr_ids = gateway.blocking_role_id, gateway.member_role_ids
+            accepted = await self.bot.db.q.accepted_ids(ctx.guild.id)
 
             await Synchronise(self.bot).roles(ctx.guild, okay, br_id, mr_ids, accepted, accepted_only)
             await ctx.send(f"{self.bot.tick} Member roles synchronised.")
@@ -552,15 +900,11 @@ class Gateway(commands.Cog):
     async def synchronise_reactions_command(self, ctx):
         async with ctx.typing():
             okay = Okay(self.bot, ctx.guild)
-            rc_id, gm_id = (
-                await self.bot.db.record(
-                    "SELECT RulesChannelID, GateMessageID FROM gateway WHERE GuildID = ?", ctx.guild.id,
-                )
-                or [None] * 2
-            )
-            accepted = await self.bot.db.column("SELECT UserID FROM accepted WHERE GuildID = ?", ctx.guild.id)
+            gateway = (await self.bot.db.settings.get(ctx.guild.id)).gateway
+            rc_id, gm_id = gateway.rules_channel_id, gateway.gate_message_id
+            accepted = await self.bot.db.q.accepted_ids(ctx.guild.id)
 
-            if gm := await okay.gate_message(rc_id, gm_id):
+            if gm := await okay.gate_message(rc_id, gm_id, fresh=True):
                 await Synchronise(self.bot).reactions(ctx.guild, gm, accepted)
                 await ctx.send(f"{self.bot.tick} Gate message reactions synchronised.")
 
@@ -577,18 +921,19 @@ class Gateway(commands.Cog):
     async def synchronise_everything_command(self, ctx, roles_for_accepted_only: t.Optional[bool] = True):
         async with ctx.typing():
             okay = Okay(self.bot, ctx.guild)
+            gateway = (await self.bot.db.settings.get(ctx.guild.id)).gateway
             rc_id, gm_id, br_id, mr_ids, er_ids = (
-                await self.bot.db.record(
-                    "SELECT RulesChannelID, GateMessageID, BlockingRoleID, MemberRoleIDs, ExceptionRoleIDs FROM gateway WHERE GuildID = ?",
-                    ctx.guild.id,
-                )
-                or [None] * 5
+                gateway.rules_channel_id,
+                gateway.gate_message_id,
+                gateway.blocking_role_id,
+                gateway.member_role_ids,
+                gateway.exception_role_ids,
             )
-            last_commit = chron.from_iso(await self.bot.db.field("SELECT Value FROM bot WHERE Key = 'last commit'"))
-            entrants = await self.bot.db.column("SELECT UserID FROM entrants WHERE GuildID = ?", ctx.guild.id)
-            accepted = await self.bot.db.column("SELECT UserID FROM accepted WHERE GuildID = ?", ctx.guild.id)
+            last_commit = chron.from_iso(await self.bot.db.q.last_commit())
+            entrants = await self.bot.db.q.entrant_ids(ctx.guild.id)
+            accepted = await self.bot.db.q.accepted_ids(ctx.guild.id)
 
-            if gm := await okay.gate_message(rc_id, gm_id):
+            if gm := await okay.gate_message(rc_id, gm_id, fresh=True):
                 sync = Synchronise(self.bot)
                 await sync.members(ctx.guild, okay, gm, br_id, mr_ids, er_ids, last_commit, entrants, accepted)
                 await sync.roles(ctx.guild, okay, br_id, mr_ids, accepted, roles_for_accepted_only)
@@ -604,14 +949,12 @@ class Gateway(commands.Cog):
     @checks.module_is_active(MODULE_NAME)
     async def checkaccepted_command(self, ctx, target: t.Optional[discord.Member]):
         if target is not None:
-            if await self.bot.db.field(
-                "SELECT UserID FROM accepted WHERE GuildID = ? AND UserID = ?", target.guild.id, target.id
-            ):
+            if await self.bot.db.buffer.exists("accepted", target.guild.id, target.id):
                 await ctx.send(f"{self.bot.tick} {target.display_name} has accepted the server rules.")
             else:
                 await ctx.send(f"{self.bot.cross} {target.display_name} has not accepted the server rules.")
         else:
-            accepted = await self.bot.db.column("SELECT UserID FROM accepted WHERE GuildID = ?", ctx.guild.id)
+            accepted = await self.bot.db.q.accepted_ids(ctx.guild.id)
             await ctx.send(
                 f"{self.bot.info} {len(accepted):,} / {len([m for m in ctx.guild.members if not m.bot]):,} members have accepted the server rules."
             )
@@ -626,7 +969,7 @@ class Gateway(commands.Cog):
     @checks.module_is_active(MODULE_NAME)
     @checks.author_can_configure()
     async def resetaccepted_command(self, ctx):
-        await ctx.bot.db.execute("DELETE FROM accepted WHERE GuildID = ?", ctx.guild.id)
+        await ctx.bot.db.q.clear_accepted(ctx.guild.id)
         await ctx.send(f"{self.bot.tick} Acceptance records for this server have been reset.")
 
 
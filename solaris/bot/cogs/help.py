@@ -23,7 +23,7 @@ from collections import defaultdict
 
 from discord.ext import commands
 
-from solaris.utils import checks, chron, converters, menu, modules, string
+from solaris.utils import Index, checks, chron, converters, menu, modules, string
 
 
 class HelpMenu(menu.MultiPageMenu):
@@ -86,8 +86,23 @@ class Help(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         if not self.bot.ready.booted:
+            self.build_command_index()
             self.bot.ready.up(self)
 
+    def build_command_index(self):
+        # Every name and alias a command can be invoked by, so close misses
+        # can be suggested.
+        self.command_index = Index()
+        self.command_names = {}
+
+        for cmd in self.bot.walk_commands():
+            parent = f"{cmd.parent.name} " if cmd.parent is not None else ""
+
+            for name in (cmd.name, *cmd.aliases):
+                key = f"{parent}{name}"
+                self.command_names[key] = cmd.qualified_name
+                self.command_index.add(key, key)
+
     @staticmethod
     async def basic_syntax(ctx, cmd, prefix):
         try:
@@ -140,7 +155,14 @@ class Help(commands.Cog):
         prefix = await self.bot.prefix(ctx.guild)
 
         if isinstance(cmd, str):
-            await ctx.send(f"{self.bot.cross} Solaris has no commands or aliases with that name.")
+            if results := self.command_index.search(cmd, limit=3, min_strength=0.6):
+                names = [f"`{name}`" for name in dict.fromkeys(self.command_names[r.key] for r in results)]
+                await ctx.send(
+                    f"{self.bot.cross} Solaris has no commands or aliases with that name. "
+                    f"Did you mean {string.list_of(names, sep='or')}?"
+                )
+            else:
+                await ctx.send(f"{self.bot.cross} Solaris has no commands or aliases with that name.")
 
         elif isinstance(cmd, commands.Command):
             if cmd.name == "config":
@@ -45,9 +45,11 @@ class Hub(commands.Cog):
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
-        await self.bot.db.execute("INSERT OR IGNORE INTO system (GuildID) VALUES (?)", guild.id)
-        await self.bot.db.execute("INSERT OR IGNORE INTO gateway (GuildID) VALUES (?)", guild.id)
-        await self.bot.db.execute("INSERT OR IGNORE INTO warn (GuildID) VALUES (?)", guild.id)
+        async with self.bot.db.transaction():
+            await self.bot.db.q.add_system_row(guild.id)
+            await self.bot.db.q.add_gateway_row(guild.id)
+            await self.bot.db.q.add_warn_row(guild.id)
+        await self.bot.db.settings.load(guild.id)
 
         if self.stdout_channel is not None:
             await self.stdout_channel.send(
@@ -56,9 +58,7 @@ class Hub(commands.Cog):
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
-        await self.bot.db.execute("DELETE FROM system WHERE GuildID = ?", guild.id)
-        await self.bot.db.execute("DELETE FROM gateway WHERE GuildID = ?", guild.id)
-        await self.bot.db.execute("DELETE FROM warn WHERE GuildID = ?", guild.id)
+        await self.bot.db.remove_guild(guild.id)
 
         if self.stdout_channel is not None:
             await self.stdout_channel.send(
@@ -18,15 +18,22 @@
 # parafoxia@carberra.xyz
 
 import datetime as dt
+import json
 import typing as t
-from os import name
+from os import close, name
+from pathlib import Path
 from platform import python_version
+from tempfile import mkstemp
 from time import time
 
+import aiofiles
+import aiofiles.os
 import discord
 import psutil
 from discord.ext import commands
 
+from solaris.db import archive
+from solaris.db.backup import BackupError
 from solaris.utils import (
     INFO_ICON,
     LOADING_ICON,
@@ -38,6 +45,7 @@ from solaris.utils import (
     menu,
     string,
 )
+from solaris.utils.guildstats import GuildStats
 from solaris.utils.modules import deactivate
 
 
@@ -95,21 +103,19 @@ class LeavingMenu(menu.SelectionMenu):
             await self.switch(pagemap, clear_reactions=True)
 
     async def leave(self):
-        dlc_id, dar_id = (
-            await self.bot.db.record(
-                "SELECT DefaultLogChannelID, DefaultAdminRoleID FROM system WHERE GuildID = ?", self.ctx.guild.id
-            )
-            or [None] * 2
-        )
+        system = (await self.bot.db.settings.get(self.ctx.guild.id)).system
 
         await deactivate.everything(self.ctx)
 
-        if self.ctx.guild.me.guild_permissions.manage_roles and (dar := self.ctx.guild.get_role(dar_id)) is not None:
+        if (
+            self.ctx.guild.me.guild_permissions.manage_roles
+            and (dar := self.ctx.guild.get_role(system.default_admin_role_id)) is not None
+        ):
             await dar.delete(reason="Solaris is leaving the server.")
 
         if (
             self.ctx.guild.me.guild_permissions.manage_channels
-            and (dlc := self.ctx.guild.get_channel(dlc_id)) is not None
+            and (dlc := self.ctx.guild.get_channel(system.default_log_channel_id)) is not None
         ):
             await dlc.delete(reason="Solaris is leaving the server.")
 
@@ -130,6 +136,7 @@ class Meta(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.guild_stats = GuildStats()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -345,7 +352,7 @@ class Meta(commands.Cog):
                         ("Blank", f"{self.bot.loc.empty:,} lines", True),
                         (
                             "Database calls since uptime",
-                            f"{self.bot.db._calls:,} ({self.bot.db._calls/uptime:,.3f} per second)",
+                            f"{(calls := self.bot.db.stats.total_calls):,} ({calls/uptime:,.3f} per second)",
                             True,
                         ),
                     ),
@@ -429,8 +436,8 @@ class Meta(commands.Cog):
         name="serverinfo", aliases=["si", "guildinfo", "gi"], help="Displays information on your server."
     )
     async def serverinfo_command(self, ctx):
-        bot_count = len([m for m in ctx.guild.members if m.bot])
-        human_count = ctx.guild.member_count - bot_count
+        counts = self.guild_stats.members(ctx.guild)
+        rest = await self.guild_stats.fetch(ctx.guild, "bans", "invites")
 
         await ctx.send(
             embed=self.bot.embed.build(
@@ -445,32 +452,24 @@ class Meta(commands.Cog):
                     ("Region", ctx.guild.region, True),
                     ("Top role", ctx.guild.roles[-1].mention, True),
                     ("Members", f"{ctx.guild.member_count:,}", True),
-                    ("Humans / bots", f"{human_count:,} / {bot_count:,}", True),
-                    (
-                        "Bans",
-                        f"{len(await ctx.guild.bans()):,}" if ctx.guild.me.guild_permissions.ban_members else "-",
-                        True,
-                    ),
+                    ("Humans / bots", f"{counts.humans:,} / {counts.bots:,}", True),
+                    ("Bans", f"{rest['bans']:,}" if rest["bans"] is not None else "-", True),
                     ("Roles", f"{len(ctx.guild.roles)-1:,}", True),
                     ("Text channels", f"{len(ctx.guild.text_channels):,}", True),
                     ("Voice channels", f"{len(ctx.guild.voice_channels):,}", True),
-                    (
-                        "Invites",
-                        f"{len(await ctx.guild.invites()):,}" if ctx.guild.me.guild_permissions.manage_guild else "-",
-                        True,
-                    ),
+                    ("Invites", f"{rest['invites']:,}" if rest["invites"] is not None else "-", True),
                     ("Emojis", f"{len(ctx.guild.emojis):,} / {ctx.guild.emoji_limit*2:,}", True),
                     ("Boosts", f"{ctx.guild.premium_subscription_count:,} (level {ctx.guild.premium_tier})", True),
-                    ("Newest member", max(ctx.guild.members, key=lambda m: m.joined_at).mention, True),
+                    ("Newest member", counts.newest.mention, True),
                     ("Created on", chron.long_date(ctx.guild.created_at), True),
                     ("Existed for", chron.short_delta(dt.datetime.utcnow() - ctx.guild.created_at), True),
                     (
                         "Statuses",
                         (
-                            f"🟢 {len([m for m in ctx.guild.members if m.status == discord.Status.online]):,} "
-                            f"🟠 {len([m for m in ctx.guild.members if m.status == discord.Status.idle]):,} "
-                            f"🔴 {len([m for m in ctx.guild.members if m.status == discord.Status.dnd]):,} "
-                            f"⚪ {len([m for m in ctx.guild.members if m.status == discord.Status.offline]):,}"
+                            f"🟢 {counts.statuses[discord.Status.online]:,} "
+                            f"🟠 {counts.statuses[discord.Status.idle]:,} "
+                            f"🔴 {counts.statuses[discord.Status.dnd]:,} "
+                            f"⚪ {counts.statuses[discord.Status.offline]:,}"
                         ),
                         False,
                     ),
@@ -695,6 +694,14 @@ class Meta(commands.Cog):
     )
     @commands.cooldown(1, 300, commands.BucketType.guild)
     async def detailedserverinfo_command(self, ctx):
+        def _count(name):
+            return f"{rest[name]:,}" if rest[name] is not None else "-"
+
+        counts = self.guild_stats.members(ctx.guild)
+        rest = await self.guild_stats.fetch(
+            ctx.guild, "prune_1d", "prune_7d", "prune_30d", "bans", "invites", "webhooks"
+        )
+
         table = {
             "overview": (
                 ("ID", ctx.guild.id, False),
@@ -723,32 +730,16 @@ class Meta(commands.Cog):
             ),
             "numerical": (
                 ("Members", f"{ctx.guild.member_count:,}", True),
-                ("Humans", f"{(hc := len([m for m in ctx.guild.members if not m.bot])):,}", True),
-                ("Bots", f"{ctx.guild.member_count - hc:,}", True),
-                ("Est. prune (1d)", f"{await ctx.guild.estimate_pruned_members(days=1):,}", True),
-                ("Est. prune (7d)", f"{await ctx.guild.estimate_pruned_members(days=7):,}", True),
-                ("Est. prune (30d)", f"{await ctx.guild.estimate_pruned_members(days=30):,}", True),
+                ("Humans", f"{counts.humans:,}", True),
+                ("Bots", f"{counts.bots:,}", True),
+                ("Est. prune (1d)", _count("prune_1d"), True),
+                ("Est. prune (7d)", _count("prune_7d"), True),
+                ("Est. prune (30d)", _count("prune_30d"), True),
                 ("Roles", f"{len(ctx.guild.roles):,}", True),
-                (
-                    "Members with top role",
-                    f"{len([m for m in ctx.guild.members if ctx.guild.roles[-1] in m.roles]):,}",
-                    True,
-                ),
-                (
-                    "Bans",
-                    f"{len(await ctx.guild.bans()) if ctx.guild.me.guild_permissions.ban_members else None:,}",
-                    True,
-                ),
-                (
-                    "Invites",
-                    f"{len(await ctx.guild.invites()) if ctx.guild.me.guild_permissions.manage_guild else None:,}",
-                    True,
-                ),
-                (
-                    "Webhooks",
-                    f"{len(await ctx.guild.webhooks()) if ctx.guild.me.guild_permissions.manage_webhooks else None:,}",
-                    True,
-                ),
+                ("Members with top role", f"{counts.with_top_role:,}", True),
+                ("Bans", _count("bans"), True),
+                ("Invites", _count("invites"), True),
+                ("Webhooks", _count("webhooks"), True),
                 ("Emojis", f"{len(ctx.guild.emojis):,}", True),
                 ("Bitrate limit", f"{ctx.guild.bitrate_limit//1000:,.0f} kbps", True),
                 ("Filesize limit", f"{ctx.guild.filesize_limit//(1024**2):,.0f} MB", True),
@@ -812,6 +803,101 @@ class Meta(commands.Cog):
         await ctx.message.delete()
         await self.bot.shutdown()
 
+    @commands.command(name="exportguild")
+    @commands.is_owner()
+    @commands.bot_has_permissions(send_messages=True, attach_files=True)
+    async def exportguild_command(self, ctx, guild_id: int, sqlite: t.Optional[bool] = False):
+        path = f"{self.bot._dynamic}/{guild_id}.{'db3' if sqlite else 'ndjson.gz'}"
+        start = time()
+        counts = await archive.export_guild(self.bot.db, guild_id, path)
+        summary = f"Exported {sum(counts.values()):,} row(s) in {time()-start:,.3f} seconds."
+
+        if (await aiofiles.os.stat(path)).st_size <= (ctx.guild.filesize_limit if ctx.guild else 8 * 1024 ** 2):
+            await ctx.send(f"{self.bot.tick} {summary}", file=discord.File(path))
+            await aiofiles.os.remove(path)
+        else:
+            await ctx.send(f"{self.bot.tick} {summary} The archive is too large to upload, so was saved to `{path}`.")
+
+    @commands.command(name="importguild")
+    @commands.is_owner()
+    async def importguild_command(self, ctx, path: t.Optional[str]):
+        if ctx.message.attachments:
+            # Only the suffix is taken from the upload, as it picks the format.
+            attachment = ctx.message.attachments[0]
+            suffix = s if (s := Path(attachment.filename).suffix.lower()) in archive.SQLITE_SUFFIXES else ".gz"
+            fd, path = mkstemp(suffix=suffix)
+            close(fd)
+            await attachment.save(path)
+        elif path is None:
+            return await ctx.send(f"{self.bot.cross} Attach an archive or give the path to one.")
+
+        start = time()
+        try:
+            guild_id, counts = await archive.import_guild(self.bot.db, path)
+        except archive.ArchiveError as exc:
+            return await ctx.send(f"{self.bot.cross} That archive could not be imported: {exc}.")
+        finally:
+            if ctx.message.attachments:
+                await aiofiles.os.remove(path)
+
+        if (gateway := self.bot.get_cog("Gateway")) is not None:
+            # Imported entrants still need kicking if they time out.
+            await gateway.timeouts.load_guild(guild_id)
+
+        await ctx.send(
+            f"{self.bot.tick} Imported {sum(counts.values()):,} row(s) for guild {guild_id} in {time()-start:,.3f} seconds."
+        )
+
+    @commands.command(name="backup")
+    @commands.is_owner()
+    async def backup_command(self, ctx):
+        async with ctx.typing():
+            try:
+                backup = await self.bot.db.backups.run()
+            except BackupError as exc:
+                return await ctx.send(f"{self.bot.cross} The database could not be backed up: {exc}.")
+
+        await ctx.send(
+            f"{self.bot.tick} Backed up the database to `{backup.path.name}` in {backup.duration*1000:,.0f} ms "
+            f"({backup.size/1024**2:,.3f} MiB, {backup.steps:,} step(s)). "
+            f"{len(self.bot.db.backups.backups):,} backup(s) are being kept."
+        )
+
+    @commands.command(name="dbstats")
+    @commands.is_owner()
+    @commands.bot_has_permissions(send_messages=True, attach_files=True)
+    async def dbstats_command(self, ctx, sort: t.Optional[str] = "total", limit: t.Optional[int] = 10):
+        stats = self.bot.db.stats
+
+        if sort == "dump":
+            path = f"{self.bot._dynamic}/dbstats.json"
+            async with aiofiles.open(path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(stats.as_dict(), indent=4))
+
+            await ctx.send(file=discord.File(path))
+            return await aiofiles.os.remove(path)
+
+        if sort == "reset":
+            stats.reset()
+            return await ctx.send(f"{self.bot.tick} Database statistics have been reset.")
+
+        if sort not in stats.SORT_KEYS:
+            return await ctx.send(
+                f"{self.bot.cross} Statistics can be sorted by: {string.list_of(stats.SORT_KEYS, sep='or')}."
+            )
+
+        lines = [
+            f"{s.count:>8,} {s.total*1000:>10,.1f} {s.p50*1000:>7,.2f} {s.p99*1000:>7,.2f} "
+            f"{s.returned:>8,} {s.affected:>8,}  {s.sql[:60]}"
+            for s in stats.top(sort, min(limit, 15))
+        ]
+        await ctx.send(
+            "```\n"
+            + f"{'calls':>8} {'total ms':>10} {'p50 ms':>7} {'p99 ms':>7} {'returned':>8} {'affected':>8}  sql\n"
+            + "\n".join(lines)
+            + f"\n\n{stats.calls:,} calls in the last {chron.short_delta(dt.timedelta(seconds=time()-stats.since))}.```"
+        )
+
 
 def setup(bot):
     bot.add_cog(Meta(bot))
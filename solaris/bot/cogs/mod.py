@@ -24,10 +24,41 @@ import typing as t
 import discord
 from discord.ext import commands
 
-from solaris.utils import chron, converters
+from solaris.utils import bulk, chron, converters
+from solaris.utils.jobs import Job
 
 UNHOIST_PATTERN = "".join(chr(i) for i in [*range(0x20, 0x30), *range(0x3A, 0x41), *range(0x5B, 0x61)])
 STRICT_UNHOIST_PATTERN = "".join(chr(i) for i in [*range(0x20, 0x41), *range(0x5B, 0x61)])
+UNHOIST_REGEXES = {
+    False: re.compile(f"[{re.escape(UNHOIST_PATTERN)}]+"),
+    True: re.compile(f"[{re.escape(STRICT_UNHOIST_PATTERN)}]+"),
+}
+
+
+class UnhoistJob(Job):
+    kind = "unhoist"
+
+    @property
+    def regex(self):
+        return UNHOIST_REGEXES[self.options.get("strict", False)]
+
+    def select(self, member):
+        return self.regex.match(member.display_name) is not None
+
+    async def action(self, member):
+        await member.edit(
+            nick=self.regex.sub("", member.display_name, 1),
+            reason=f"Unhoisted. - Actioned by {self.options.get('actioned_by', 'Solaris')}",
+        )
+
+    def progress(self):
+        return (
+            f"{self.bot.info} Unhoisting nicknames... "
+            f"{self.checked:,} of {self.total:,} members checked, {self.changed:,} nicknames unhoisted so far."
+        )
+
+    def finished(self):
+        return f"{self.bot.info} Unhoisted {self.changed:,} nicknames."
 
 
 class Mod(commands.Cog):
@@ -39,6 +70,7 @@ class Mod(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         if not self.bot.ready.booted:
+            await self.bot.jobs.resume(UnhoistJob)
             self.bot.ready.up(self)
 
     @commands.command(name="kick", help="Kicks one or more members from your server.")
@@ -50,22 +82,18 @@ class Mod(commands.Cog):
         if not targets:
             await ctx.send(f"{self.bot.cross} No valid targets were passed.")
         else:
-            count = 0
-
             async with ctx.typing():
-                for target in targets:
-                    try:
-                        await target.kick(reason=f"{reason} - Actioned by {ctx.author.name}")
-                        count += 1
-                    except discord.Forbidden:
-                        await ctx.send(
-                            f"Failed to kick {target.display_name} as their permission set is superior to Solaris'."
-                        )
-
-                if count > 0:
-                    await ctx.send(f"{self.bot.tick} {count:,} member(s) were kicked.")
-                else:
-                    await ctx.send(f"{self.bot.cross} No members were kicked.")
+                result = await bulk.run(
+                    lambda target: target.kick(reason=f"{reason} - Actioned by {ctx.author.name}"), targets
+                )
+                await ctx.send(
+                    result.summary(
+                        self.bot,
+                        "{count:,} member(s) were kicked",
+                        "No members were kicked.",
+                        "Failed to kick {target} as {reason}.",
+                    )
+                )
 
     @commands.command(
         name="ban",
@@ -91,29 +119,26 @@ class Mod(commands.Cog):
                 f"{self.bot.cross} The number of days to delete is outside valid bounds - it should be between 0 and 7 inclusive."
             )
         else:
-            count = 0
+            async def _ban(target):
+                await ctx.guild.ban(
+                    target,
+                    delete_message_days=delete_message_days,
+                    reason=(
+                        (f"{reason}" if isinstance(target, discord.Member) else f"{reason} (Hackban)")
+                        + f" - Actioned by {ctx.author.name}"
+                    ),
+                )
 
             async with ctx.typing():
-                for target in targets:
-                    try:
-                        await ctx.guild.ban(
-                            target,
-                            delete_message_days=delete_message_days,
-                            reason=(
-                                (f"{reason}" if target in ctx.guild.members else f"{reason} (Hackban)")
-                                + f" - Actioned by {ctx.author.name}"
-                            ),
-                        )
-                        count += 1
-                    except discord.Forbidden:
-                        await ctx.send(
-                            f"Failed to ban {target.display_name} as their permission set is superior to Solaris'."
-                        )
-
-                if count > 0:
-                    await ctx.send(f"{self.bot.tick} {count:,} member(s) were banned.")
-                else:
-                    await ctx.send(f"{self.bot.cross} No members were banned.")
+                result = await bulk.run(_ban, targets)
+                await ctx.send(
+                    result.summary(
+                        self.bot,
+                        "{count:,} member(s) were banned",
+                        "No members were banned.",
+                        "Failed to ban {target} as {reason}.",
+                    )
+                )
 
     @commands.command(
         name="unban",
@@ -127,17 +152,23 @@ class Mod(commands.Cog):
         if not targets:
             await ctx.send(f"{self.bot.cross} No valid targets were passed.")
         else:
-            count = 0
-
             async with ctx.typing():
-                for target in targets:
-                    await ctx.guild.unban(target, reason=f"{reason} - Actioned by {ctx.author.name}")
-                    count += 1
-
-                if count > 0:
-                    await ctx.send(f"{self.bot.tick} {count:,} user(s) were unbanned.")
-                else:
-                    await ctx.send(f"{self.bot.cross} No users were unbanned.")
+                result = await bulk.run(
+                    lambda target: ctx.guild.unban(target, reason=f"{reason} - Actioned by {ctx.author.name}"),
+                    targets,
+                    reasons={
+                        discord.Forbidden: "Solaris is not allowed to unban them",
+                        discord.NotFound: "they are not banned",
+                    },
+                )
+                await ctx.send(
+                    result.summary(
+                        self.bot,
+                        "{count:,} user(s) were unbanned",
+                        "No users were unbanned.",
+                        "Failed to unban {target} as {reason}.",
+                    )
+                )
 
     @commands.command(name="clear", aliases=["clr"], help="Clears up to 100 messages from a channel.")
     @commands.has_permissions(manage_messages=True)
@@ -217,22 +248,18 @@ class Mod(commands.Cog):
     async def clearnickname_command(
         self, ctx, targets: commands.Greedy[discord.Member], *, reason: t.Optional[str] = "No reason provided."
     ):
-        count = 0
-
         async with ctx.typing():
-            for target in targets:
-                try:
-                    await target.edit(nick=None, reason=f"{reason} - Actioned by {ctx.author.name}")
-                    count += 1
-                except discord.Forbidden:
-                    await ctx.send(
-                        f"Failed to clear {target.display_name}'s nickname as their permission set is superior to Solaris'."
-                    )
-
-            if count > 0:
-                await ctx.send(f"{self.bot.tick} Cleared {count:,} member(s)' nicknames.")
-            else:
-                await ctx.send(f"{self.bot.cross} No members' nicknames were changed.")
+            result = await bulk.run(
+                lambda target: target.edit(nick=None, reason=f"{reason} - Actioned by {ctx.author.name}"), targets
+            )
+            await ctx.send(
+                result.summary(
+                    self.bot,
+                    "Cleared {count:,} member(s)' nicknames",
+                    "No members' nicknames were changed.",
+                    "Failed to clear {target}'s nickname as {reason}.",
+                )
+            )
 
     @commands.command(
         name="unhoistnicknames", cooldown_after_parsing=True, help="Unhoists the nicknames of all members.",
@@ -241,24 +268,21 @@ class Mod(commands.Cog):
     @commands.has_permissions(manage_nicknames=True)
     @commands.bot_has_permissions(send_messages=True, manage_nicknames=True)
     async def unhoistnicknames_command(self, ctx, *, strict: t.Optional[bool] = False):
-        count = 0
-
-        async with ctx.typing():
-            for member in ctx.guild.members:
-                try:
-                    match = re.match(
-                        rf"[{STRICT_UNHOIST_PATTERN if strict else UNHOIST_PATTERN}]+", member.display_name
-                    )
-                    if match is not None:
-                        await member.edit(
-                            nick=member.display_name.replace(match.group(), "", 1),
-                            reason=f"Unhoisted. - Actioned by {ctx.author.name}",
-                        )
-                        count += 1
-                except discord.Forbidden:
-                    pass
-
-            await ctx.send(f"{self.bot.info} Unhoisted {count:,} nicknames.")
+        if self.bot.jobs.running(ctx.guild.id, UnhoistJob.kind):
+            await ctx.send(f"{self.bot.cross} Nicknames are already being unhoisted in this server.")
+        else:
+            # Runs in the background and resumes after a restart, so large
+            # servers don't hold the command up for hours.
+            msg = await ctx.send(f"{self.bot.info} Unhoisting nicknames...")
+            await self.bot.jobs.start(
+                UnhoistJob(
+                    self.bot,
+                    ctx.guild,
+                    ctx.channel.id,
+                    msg.id,
+                    options={"strict": bool(strict), "actioned_by": ctx.author.name},
+                )
+            )
 
     @commands.group(
         name="delete",
@@ -326,15 +350,26 @@ class Mod(commands.Cog):
             await ctx.send(f"{self.bot.cross} No valid targets were passed.")
         else:
             ctx_in_targets = ctx.channel in targets
-            count = 0
 
             async with ctx.typing():
-                for target in targets:
-                    await target.delete(reason=f"{reason} - Actioned by {ctx.author.name}")
-                    count += 1
+                result = await bulk.run(
+                    lambda target: target.delete(reason=f"{reason} - Actioned by {ctx.author.name}"),
+                    targets,
+                    reasons={
+                        discord.Forbidden: "Solaris is not allowed to manage it",
+                        discord.NotFound: "it no longer exists",
+                    },
+                )
 
             if not ctx_in_targets:
-                await ctx.send(f"{self.bot.tick} {count:,} channel(s) were deleted.")
+                await ctx.send(
+                    result.summary(
+                        self.bot,
+                        "{count:,} channel(s) were deleted",
+                        "No channels were deleted.",
+                        "Failed to delete {target} as {reason}.",
+                    )
+                )
 
     @delete_group.command(
         name="category",
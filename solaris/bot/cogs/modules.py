@@ -76,11 +76,8 @@ class SetupMenu(menu.SelectionMenu):
                     topic=f"Log output for {self.ctx.guild.me.mention}",
                     reason="Needed for Solaris log output.",
                 )
-                await self.bot.db.execute(
-                    "UPDATE system SET DefaultLogChannelID = ?, LogChannelID = ? WHERE GuildID = ?",
-                    lc.id,
-                    lc.id,
-                    self.ctx.guild.id,
+                await self.bot.db.settings.update(
+                    self.ctx.guild.id, "system", default_log_channel_id=lc.id, log_channel_id=lc.id
                 )
                 await lc.send(f"{self.bot.tick} The log channel has been created and set to {lc.mention}.")
             else:
@@ -100,11 +97,8 @@ class SetupMenu(menu.SelectionMenu):
                     permissions=discord.Permissions(permissions=0),
                     reason="Needed for Solaris configuration.",
                 )
-                await self.bot.db.execute(
-                    "UPDATE system SET DefaultAdminRoleID = ?, AdminRoleID = ? WHERE GuildID = ?",
-                    ar.id,
-                    ar.id,
-                    self.ctx.guild.id,
+                await self.bot.db.settings.update(
+                    self.ctx.guild.id, "system", default_admin_role_id=ar.id, admin_role_id=ar.id
                 )
                 await lc.send(f"{self.bot.tick} The admin role has been created and set to {ar.mention}.")
             else:
@@ -72,12 +72,7 @@ class Warn(commands.Cog):
         if (comment is not None) and len(comment) > 255:
             return await ctx.send(f"{self.bot.cross} The comment must not exceed 255 characters in length.")
 
-        type_map = {
-            warn_type: points
-            for warn_type, points in await self.bot.db.records(
-                "SELECT WarnType, Points FROM warntypes WHERE GuildID = ?", ctx.guild.id
-            )
-        }
+        type_map = {warn_type: points for warn_type, points in await self.bot.db.q.warn_types(ctx.guild.id)}
 
         if warn_type not in type_map.keys():
             return await ctx.send(f"{self.bot.cross} That warn type does not exist.")
@@ -87,8 +82,7 @@ class Warn(commands.Cog):
                 await ctx.send(f"{self.bot.info} Skipping {target.display_name} as bots can not be warned.")
                 continue
 
-            await self.bot.db.execute(
-                "INSERT INTO warns (WarnID, GuildID, UserID, ModID, WarnType, Points, Comment) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            await self.bot.db.q.add_warning(
                 self.bot.generate_id(),
                 ctx.guild.id,
                 target.id,
@@ -98,13 +92,9 @@ class Warn(commands.Cog):
                 comment,
             )
 
-            records = await self.bot.db.records(
-                "SELECT WarnType, Points FROM warns WHERE GuildID = ? AND UserID = ?", ctx.guild.id, target.id
-            )
-            max_points, max_strikes = (
-                await self.bot.db.record("SELECT MaxPoints, MaxStrikes FROM warn WHERE GuildID = ?", ctx.guild.id)
-                or [None] * 2
-            )
+            records = await self.bot.db.q.warning_points(ctx.guild.id, target.id)
+            settings = (await self.bot.db.settings.get(ctx.guild.id)).warn
+            max_points, max_strikes = settings.max_points, settings.max_strikes
 
             if (wc := [r[0] for r in records].count(warn_type)) >= (max_strikes or 3):
                 # Account for unbans.
@@ -129,7 +119,7 @@ class Warn(commands.Cog):
     @checks.module_has_initialised(MODULE_NAME)
     @checks.author_can_warn()
     async def warn_remove_command(self, ctx, warn_id: str):
-        modified = await self.bot.db.execute("DELETE FROM warns WHERE WarnID = ?", warn_id)
+        modified = await self.bot.db.q.remove_warning(warn_id)
 
         if not modified:
             return await ctx.send(f"{self.bot.cross} That warn ID is not valid.")
@@ -140,9 +130,7 @@ class Warn(commands.Cog):
     @checks.module_has_initialised(MODULE_NAME)
     @commands.has_permissions(administrator=True)
     async def warn_reset_command(self, ctx, target: discord.Member):
-        modified = await self.bot.db.execute(
-            "DELETE FROM warns WHERE GuildID = ? AND UserID = ?", ctx.guild.id, target.id
-        )
+        modified = await self.bot.db.q.clear_warnings(ctx.guild.id, target.id)
 
         if not modified:
             return await ctx.send(f"{self.bot.cross} That member does not have any warns.")
@@ -159,8 +147,7 @@ class Warn(commands.Cog):
                 f"{self.bot.cross} Solaris was unable to identify a member with the information provided."
             )
 
-        records = await self.bot.db.records(
-            "SELECT WarnID, ModID, WarnTime, WarnType, Points, Comment FROM warns WHERE GuildID = ? AND UserID = ? ORDER BY WarnTime DESC",
+        records = await self.bot.db.q.warnings(
             ctx.guild.id,
             target.id,
         )
@@ -232,7 +219,7 @@ class Warn(commands.Cog):
                 f"{self.bot.cross} The number of points for this warn type must be between {MIN_POINTS} and {MAX_POINTS} inclusive."
             )
 
-        warn_types = await self.bot.db.column("SELECT WarnType FROM warntypes WHERE GuildID = ?", ctx.guild.id)
+        warn_types = await self.bot.db.q.warn_type_names(ctx.guild.id)
 
         if len(warn_types) == MAX_WARNTYPES:
             return await ctx.send(f"{self.bot.cross} You can only set up to {MAX_WARNTYPES} warn types.")
@@ -243,9 +230,7 @@ class Warn(commands.Cog):
                 f"{self.bot.cross} That warn type already exists. You can use `{prefix}warntype edit {warn_type}`"
             )
 
-        await self.bot.db.execute(
-            "INSERT INTO warntypes (GuildID, WarnType, Points) VALUES (?, ?, ?)", ctx.guild.id, warn_type, points
-        )
+        await self.bot.db.q.add_warn_type(ctx.guild.id, warn_type, points)
         await ctx.send(
             f'{self.bot.tick} The warn type "{warn_type}" has been created, and is worth {points} point(s).'
         )
@@ -273,7 +258,7 @@ class Warn(commands.Cog):
             if new_name == warn_type:
                 return await ctx.send(f'{self.bot.cross} That warn type "{new_name}" already exists.')
 
-            warn_types = await self.bot.db.column("SELECT WarnType FROM warntypes WHERE GuildID = ?", ctx.guild.id)
+            warn_types = await self.bot.db.q.warn_type_names(ctx.guild.id)
 
             if warn_type not in warn_types:
                 return await ctx.send(f'{self.bot.cross} The warn type "{warn_type}" does not exist.')
@@ -282,12 +267,9 @@ class Warn(commands.Cog):
                 return await ctx.send(f'{self.bot.cross} That warn type "{new_name}" already exists.')
 
         if new_name and new_points:
-            if await self.bot.db.field("SELECT RetroUpdates FROM warn WHERE GuildID = ?", ctx.guild.id):
-                default = await self.bot.db.field(
-                    "SELECT Points FROM warntypes WHERE GuildID = ? AND WarnType = ?", ctx.guild.id, warn_type
-                )
-                await self.bot.db.execute(
-                    "UPDATE warns SET WarnType = ?, Points = ? WHERE GuildID = ? AND WarnType = ? AND Points = ?",
+            if (await self.bot.db.settings.get(ctx.guild.id)).warn.retro_updates:
+                default = await self.bot.db.q.warn_type_points(ctx.guild.id, warn_type)
+                await self.bot.db.q.rename_and_repoint_warnings(
                     new_name,
                     new_points,
                     ctx.guild.id,
@@ -295,41 +277,35 @@ class Warn(commands.Cog):
                     default,
                 )
             else:
-                await self.bot.db.execute(
-                    "UPDATE warns SET WarnType = ? WHERE GuildID = ? AND WarnType = ?",
+                await self.bot.db.q.rename_warnings(
                     new_name,
                     ctx.guild.id,
                     warn_type,
                 )
         elif new_name:
-            await self.bot.db.execute(
-                "UPDATE warntypes SET WarnType = ? WHERE GuildID = ? AND WarnType = ?",
-                new_name,
-                ctx.guild.id,
-                warn_type,
-            )
-            await self.bot.db.execute(
-                "UPDATE warns SET WarnType = ? WHERE GuildID = ? AND WarnType = ?", new_name, ctx.guild.id, warn_type
-            )
+            async with self.bot.db.transaction():
+                await self.bot.db.q.rename_warn_type(
+                    new_name,
+                    ctx.guild.id,
+                    warn_type,
+                )
+                await self.bot.db.q.rename_warnings(new_name, ctx.guild.id, warn_type)
             await ctx.send(f'{self.bot.tick} The warn type "{warn_type}" has been renamed to "{new_name}".')
         elif new_points:
-            if await self.bot.db.field("SELECT RetroUpdates FROM warn WHERE GuildID = ?", ctx.guild.id):
-                default = await self.bot.db.field(
-                    "SELECT Points FROM warntypes WHERE GuildID = ? AND WarnType = ?", ctx.guild.id, warn_type
-                )
-                await self.bot.db.execute(
-                    "UPDATE warns SET Points = ? WHERE GuildID = ? AND WarnType = ? AND Points = ?",
+            async with self.bot.db.transaction():
+                if (await self.bot.db.settings.get(ctx.guild.id)).warn.retro_updates:
+                    default = await self.bot.db.q.warn_type_points(ctx.guild.id, warn_type)
+                    await self.bot.db.q.repoint_warnings(
+                        new_points,
+                        ctx.guild.id,
+                        warn_type,
+                        default,
+                    )
+                await self.bot.db.q.repoint_warn_type(
                     new_points,
                     ctx.guild.id,
                     warn_type,
-                    default,
                 )
-            await self.bot.db.execute(
-                "UPDATE warntypes SET Points = ? WHERE GuildID = ? AND WarnType = ?",
-                new_points,
-                ctx.guild.id,
-                warn_type,
-            )
             await ctx.send(f'{self.bot.tick} The warn type "{warn_type}" is now worth {new_points} point(s).')
 
     @warntype_group.command(
@@ -343,21 +319,20 @@ class Warn(commands.Cog):
         if any(c not in ascii_lowercase for c in warn_type):
             return await ctx.send("Warn types can only contain lower case letters.")
 
-        modified = await self.bot.db.execute(
-            "DELETE FROM warntypes WHERE GuildID = ? AND WarnType = ?", ctx.guild.id, warn_type
-        )
+        async with self.bot.db.transaction():
+            if modified := await self.bot.db.q.remove_warn_type(ctx.guild.id, warn_type):
+                await self.bot.db.q.clear_warnings_of_type(ctx.guild.id, warn_type)
 
         if not modified:
             return await ctx.send(f"{self.bot.cross} That warn type does not exist.")
 
-        await self.bot.db.execute("DELETE FROM warns WHERE GuildID = ? AND WarnType = ?", ctx.guild.id, warn_type)
         await ctx.send(f'{self.bot.tick} Warn type "{warn_type}" deleted.')
 
     @warntype_group.group(name="list", help="Lists the server's warn types.")
     @checks.module_has_initialised(MODULE_NAME)
     @checks.author_can_warn()
     async def warntype_list_command(self, ctx):
-        records = await self.bot.db.records("SELECT WarnType, Points FROM warntypes WHERE GuildID = ?", ctx.guild.id)
+        records = await self.bot.db.q.warn_types(ctx.guild.id)
 
         await ctx.send(
             embed=self.bot.embed.build(
@@ -40,3 +40,16 @@ class Config:
     HUB_COMMANDS_CHANNEL_ID: Final = int(getenv("HUB_COMMANDS_CHANNEL_ID", ""))
     HUB_RELAY_CHANNEL_ID: Final = int(getenv("HUB_RELAY_CHANNEL_ID", ""))
     HUB_STDOUT_CHANNEL_ID: Final = int(getenv("HUB_STDOUT_CHANNEL_ID", ""))
+    DB_BACKEND: Final = getenv("DB_BACKEND", "sqlite")
+    DB_URL: Final = getenv("DB_URL", "")
+    DB_READERS: Final = int(getenv("DB_READERS", "2"))
+    DB_STATEMENT_CACHE: Final = int(getenv("DB_STATEMENT_CACHE", "256"))
+    DB_WRITE_BUFFER_SIZE: Final = int(getenv("DB_WRITE_BUFFER_SIZE", "250"))
+    DB_WRITE_BUFFER_INTERVAL: Final = float(getenv("DB_WRITE_BUFFER_INTERVAL", "2"))
+    DB_DURABILITY: Final = getenv("DB_DURABILITY", "grouped")
+    DB_COMMIT_INTERVAL: Final = int(getenv("DB_COMMIT_INTERVAL", "100"))
+    DB_BACKUP_INTERVAL: Final = float(getenv("DB_BACKUP_INTERVAL", "6"))
+    DB_BACKUP_KEEP: Final = int(getenv("DB_BACKUP_KEEP", "7"))
+    DB_BACKUP_PAGES: Final = int(getenv("DB_BACKUP_PAGES", "256"))
+    GATEWAY_SYNC_CONCURRENCY: Final = int(getenv("GATEWAY_SYNC_CONCURRENCY", "4"))
+    GATEWAY_SYNC_TIMEOUT: Final = float(getenv("GATEWAY_SYNC_TIMEOUT", "600"))
@@ -0,0 +1,25 @@
+-- Solaris - A Discord bot designed to make your server a safer and better place.
+-- Copyright (C) 2020  Ethan Henderson
+
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+
+-- You should have received a copy of the GNU General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+-- Ethan Henderson
+-- parafoxia@carberra.xyz
+
+-- warn
+
+-- Covers both the point totals and the ordered warn list for a member.
+CREATE INDEX IF NOT EXISTS warns_member ON warns (GuildID, UserID, WarnTime, WarnType, Points);
+
+CREATE INDEX IF NOT EXISTS warns_type ON warns (GuildID, WarnType, Points);
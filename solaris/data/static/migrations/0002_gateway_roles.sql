@@ -0,0 +1,66 @@
+-- Solaris - A Discord bot designed to make your server a safer and better place.
+-- Copyright (C) 2020  Ethan Henderson
+
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+
+-- You should have received a copy of the GNU General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+-- Ethan Henderson
+-- parafoxia@carberra.xyz
+
+-- gateway
+
+CREATE TABLE IF NOT EXISTS gateway_roles (
+	GuildID integer,
+	Kind text,
+	RoleID integer,
+	PRIMARY KEY (GuildID, Kind, RoleID)
+);
+
+-- Split the old comma-separated columns into rows.
+INSERT OR IGNORE INTO gateway_roles
+WITH RECURSIVE split (GuildID, Kind, RoleID, Rest) AS (
+	SELECT GuildID, Kind, '', IDs || ',' FROM (
+		SELECT GuildID, 'member' AS Kind, MemberRoleIDs AS IDs FROM gateway
+		UNION ALL
+		SELECT GuildID, 'exception', ExceptionRoleIDs FROM gateway
+	) WHERE IDs IS NOT NULL AND IDs != ''
+	UNION ALL
+	SELECT GuildID, Kind, substr(Rest, 1, instr(Rest, ',') - 1), substr(Rest, instr(Rest, ',') + 1)
+	FROM split WHERE Rest != ''
+)
+SELECT GuildID, Kind, CAST(RoleID AS integer) FROM split WHERE RoleID != '';
+
+CREATE TABLE gateway_new (
+	GuildID integer PRIMARY KEY,
+	Active integer DEFAULT 0,
+	RulesChannelID integer,
+	GateMessageID integer,
+	BlockingRoleID integer,
+	WelcomeChannelID integer,
+	GoodbyeChannelID integer,
+	Timeout integer,
+	GateText text,
+	WelcomeText text,
+	WelcomeBotText text,
+	GoodbyeText text,
+	GoodbyeBotText text
+);
+
+INSERT INTO gateway_new
+SELECT GuildID, Active, RulesChannelID, GateMessageID, BlockingRoleID, WelcomeChannelID, GoodbyeChannelID, Timeout,
+	GateText, WelcomeText, WelcomeBotText, GoodbyeText, GoodbyeBotText
+FROM gateway;
+
+DROP TABLE gateway;
+
+ALTER TABLE gateway_new RENAME TO gateway;
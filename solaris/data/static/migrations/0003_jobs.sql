@@ -0,0 +1,34 @@
+-- Solaris - A Discord bot designed to make your server a safer and better place.
+-- Copyright (C) 2020  Ethan Henderson
+
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+
+-- You should have received a copy of the GNU General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+-- Ethan Henderson
+-- parafoxia@carberra.xyz
+
+-- jobs
+
+-- Long-running per-guild jobs, checkpointed so they survive restarts.
+-- Cursor is the ID of the last member processed.
+CREATE TABLE IF NOT EXISTS jobs (
+	GuildID integer,
+	Kind text,
+	ChannelID integer,
+	MessageID integer,
+	Cursor integer DEFAULT 0,
+	Checked integer DEFAULT 0,
+	Changed integer DEFAULT 0,
+	Options text,
+	PRIMARY KEY (GuildID, Kind)
+);
@@ -0,0 +1,108 @@
+-- Solaris - A Discord bot designed to make your server a safer and better place.
+-- Copyright (C) 2020  Ethan Henderson
+
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+
+-- You should have received a copy of the GNU General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+-- Ethan Henderson
+-- parafoxia@carberra.xyz
+
+-- The PostgreSQL equivalent of ../build.sql. Timestamps are kept as text
+-- in the same format sqlite's CURRENT_TIMESTAMP uses, so the two can share
+-- archives and the code never has to care which one it is talking to.
+
+CREATE TABLE IF NOT EXISTS bot (
+	Key text PRIMARY KEY,
+	Value text
+);
+
+INSERT INTO bot VALUES ('last commit', to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS'))
+ON CONFLICT DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS errors (
+	Ref text PRIMARY KEY,
+	ErrorTime text DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS'),
+	Cause text,
+	Traceback text
+);
+
+CREATE TABLE IF NOT EXISTS system (
+	GuildID bigint PRIMARY KEY,
+	RunFTS integer DEFAULT 0,
+	Prefix text DEFAULT '>>',
+	DefaultLogChannelID bigint,
+	LogChannelID bigint,
+	DefaultAdminRoleID bigint,
+	AdminRoleID bigint
+);
+
+-- gateway
+
+CREATE TABLE IF NOT EXISTS gateway (
+	GuildID bigint PRIMARY KEY,
+	Active integer DEFAULT 0,
+	RulesChannelID bigint,
+	GateMessageID bigint,
+	BlockingRoleID bigint,
+	MemberRoleIDs text,
+	ExceptionRoleIDs text,
+	WelcomeChannelID bigint,
+	GoodbyeChannelID bigint,
+	Timeout integer,
+	GateText text,
+	WelcomeText text,
+	WelcomeBotText text,
+	GoodbyeText text,
+	GoodbyeBotText text
+);
+
+CREATE TABLE IF NOT EXISTS entrants (
+	GuildID bigint,
+	UserID bigint,
+	Timeout text,
+	PRIMARY KEY (GuildID, UserID)
+);
+
+CREATE TABLE IF NOT EXISTS accepted (
+	GuildID bigint,
+	UserID bigint,
+	PRIMARY KEY (GuildID, UserID)
+);
+
+-- warn
+
+CREATE TABLE IF NOT EXISTS warn (
+	GuildID bigint PRIMARY KEY,
+	WarnRoleID bigint,
+	MaxPoints integer,
+	MaxStrikes integer,
+	RetroUpdates integer DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS warntypes (
+	GuildID bigint,
+	WarnType text,
+	Points integer,
+	PRIMARY KEY (GuildID, WarnType)
+);
+
+CREATE TABLE IF NOT EXISTS warns (
+	WarnID text PRIMARY KEY,
+	GuildID bigint,
+	UserID bigint,
+	ModID bigint,
+	WarnTime text DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS'),
+	WarnType text,
+	Points integer,
+	Comment text
+);
@@ -0,0 +1,39 @@
+-- Solaris - A Discord bot designed to make your server a safer and better place.
+-- Copyright (C) 2020  Ethan Henderson
+
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+
+-- You should have received a copy of the GNU General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+-- Ethan Henderson
+-- parafoxia@carberra.xyz
+
+-- gateway
+
+CREATE TABLE IF NOT EXISTS gateway_roles (
+	GuildID bigint,
+	Kind text,
+	RoleID bigint,
+	PRIMARY KEY (GuildID, Kind, RoleID)
+);
+
+-- Split the old comma-separated columns into rows.
+INSERT INTO gateway_roles
+SELECT DISTINCT GuildID, Kind, CAST(RoleID AS bigint) FROM (
+	SELECT GuildID, 'member' AS Kind, unnest(string_to_array(MemberRoleIDs, ',')) AS RoleID FROM gateway
+	UNION ALL
+	SELECT GuildID, 'exception', unnest(string_to_array(ExceptionRoleIDs, ',')) FROM gateway
+) AS split
+WHERE RoleID != ''
+ON CONFLICT DO NOTHING;
+
+ALTER TABLE gateway DROP COLUMN IF EXISTS MemberRoleIDs, DROP COLUMN IF EXISTS ExceptionRoleIDs;
@@ -18,3 +18,7 @@
 # parafoxia@carberra.xyz
 
 from .db import Database
+from .migrations import Migrator
+from .queries import QueryRegistry
+from .settings import GuildSettings, SettingsCache
+from .stats import DatabaseStats
@@ -0,0 +1,253 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import datetime as dt
+import gzip
+import json
+import sqlite3
+import typing as t
+from asyncio import get_running_loop
+from pathlib import Path
+
+from aiosqlite import connect
+
+from solaris.db.queries import GUILD_TABLES
+
+FORMAT: t.Final = "solaris-guild"
+FORMAT_VERSION: t.Final = 1
+CHUNK_SIZE: t.Final = 1000
+SQLITE_SUFFIXES: t.Final = (".db", ".db3", ".sqlite", ".sqlite3")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class NDJSONArchive:
+    # One JSON document per line, gzipped: a metadata line, then for each
+    # table a header line naming its columns followed by one array per row.
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    async def _run(self, func, *args):
+        return await get_running_loop().run_in_executor(None, func, *args)
+
+    async def open(self, mode):
+        try:
+            self._file = await self._run(gzip.open, self.path, f"{mode}t", 6, "utf-8")
+        except OSError as exc:
+            raise ArchiveError(f"{self.path} could not be opened ({exc.strerror or exc})") from None
+
+    async def close(self):
+        await self._run(self._file.close)
+
+    async def write_meta(self, meta):
+        await self._run(self._file.write, json.dumps({"meta": meta}) + "\n")
+
+    async def write_rows(self, table, columns, rows):
+        lines = [json.dumps({"table": table, "columns": columns})] if columns else []
+        lines.extend(json.dumps(row) for row in rows)
+        await self._run(self._file.write, "\n".join(lines) + "\n")
+
+    async def read_meta(self):
+        try:
+            return json.loads(await self._run(self._file.readline))["meta"]
+        except (OSError, ValueError, KeyError):
+            raise ArchiveError("this is not a Solaris guild archive") from None
+
+    async def read_rows(self):
+        table = columns = None
+
+        while lines := await self._read_lines():
+            rows = []
+
+            for line in lines:
+                if isinstance(doc := self._parse(line), dict):
+                    if rows:
+                        yield table, columns, rows
+                        rows = []
+                    table, columns = doc["table"], doc["columns"]
+                else:
+                    rows.append(doc)
+
+            if rows:
+                yield table, columns, rows
+
+    async def _read_lines(self):
+        try:
+            return await self._run(self._file.readlines, 1 << 16)
+        except (OSError, EOFError):
+            raise ArchiveError("the archive is corrupt or truncated") from None
+
+    @staticmethod
+    def _parse(line):
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            raise ArchiveError("the archive is corrupt") from None
+
+        if isinstance(doc, dict) and not {"table", "columns"} <= doc.keys():
+            raise ArchiveError("the archive is corrupt")
+
+        return doc
+
+
+class SQLiteArchive:
+    # A plain SQLite file with one table per Solaris table plus a `meta`
+    # table, so it can be ATTACHed and inspected with any SQLite client.
+    def __init__(self, path):
+        self.path = Path(path)
+        self._cxn = None
+
+    async def open(self, mode):
+        if mode == "r" and not self.path.is_file():
+            raise ArchiveError(f"{self.path} does not exist")
+
+        if mode == "w" and self.path.is_file():
+            self.path.unlink()
+
+        try:
+            self._cxn = await connect(self.path)
+        except sqlite3.Error as exc:
+            raise ArchiveError(f"{self.path} could not be opened ({exc})") from None
+
+    async def close(self):
+        await self._cxn.commit()
+        await self._cxn.close()
+
+    async def write_meta(self, meta):
+        await self._cxn.execute("CREATE TABLE meta (Key text PRIMARY KEY, Value text)")
+        await self._cxn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, json.dumps(v)) for k, v in meta.items()])
+
+    async def write_rows(self, table, columns, rows):
+        if columns:
+            await self._cxn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+            self._columns = columns
+
+        await self._cxn.executemany(
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(self._columns))})",
+            rows,
+        )
+
+    async def read_meta(self):
+        try:
+            cur = await self._cxn.execute("SELECT Key, Value FROM meta")
+        except Exception:
+            raise ArchiveError("this is not a Solaris guild archive") from None
+
+        return {key: json.loads(value) for key, value in await cur.fetchall()}
+
+    async def read_rows(self):
+        cur = await self._cxn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        stored = {row[0] for row in await cur.fetchall()}
+
+        for table in filter(lambda t: t in stored, GUILD_TABLES):
+            cur = await self._cxn.execute(f"SELECT * FROM {table}")
+            columns = [d[0] for d in cur.description]
+
+            while rows := await cur.fetchmany(CHUNK_SIZE):
+                yield table, columns, rows
+
+
+def open_archive(path):
+    if Path(path).suffix in SQLITE_SUFFIXES:
+        return SQLiteArchive(path)
+
+    return NDJSONArchive(path)
+
+
+async def export_guild(db, guild_id, path):
+    archive = open_archive(path)
+    counts = {}
+
+    await archive.open("w")
+    try:
+        await archive.write_meta(
+            {
+                "format": FORMAT,
+                "version": FORMAT_VERSION,
+                "guild_id": guild_id,
+                "schema_version": await db.migrator.version(),
+                "exported_at": dt.datetime.utcnow().isoformat(),
+            }
+        )
+
+        for table in GUILD_TABLES:
+            columns = await db.q.table_columns(table)
+            counts[table] = 0
+
+            async for rows in db.stream(f"SELECT {', '.join(columns)} FROM {table} WHERE GuildID = ?", guild_id):
+                # The column header is only written before the first chunk.
+                await archive.write_rows(table, columns if not counts[table] else None, rows)
+                counts[table] += len(rows)
+
+            if not counts[table]:
+                await archive.write_rows(table, columns, [])
+    finally:
+        await archive.close()
+
+    return counts
+
+
+async def import_guild(db, path):
+    archive = open_archive(path)
+    counts = {}
+
+    await archive.open("r")
+    try:
+        meta = await archive.read_meta()
+
+        if meta.get("format") != FORMAT or meta.get("version") != FORMAT_VERSION:
+            raise ArchiveError("this is not a Solaris guild archive, or was made by an incompatible version")
+
+        if meta["schema_version"] != (version := await db.migrator.version()):
+            raise ArchiveError(
+                f"the archive was made at schema version {meta['schema_version']}, "
+                f"but this database is at schema version {version}"
+            )
+
+        guild_id = meta["guild_id"]
+        known = {table: {c.lower() for c in await db.q.table_columns(table)} for table in GUILD_TABLES}
+
+        async with db.transaction():
+            # Whatever is stored for the guild is replaced wholesale.
+            await db.remove_guild(guild_id)
+
+            async for table, columns, rows in archive.read_rows():
+                # PostgreSQL folds unquoted names to lower case, so archives
+                # made by either backend can be imported into the other.
+                lowered = [c.lower() for c in columns]
+                if table not in known or "guildid" not in lowered or not set(lowered) <= known[table]:
+                    raise ArchiveError(f"the archive does not match this database's schema ({table})")
+
+                index = lowered.index("guildid")
+                if any(row[index] != guild_id for row in rows):
+                    raise ArchiveError(f"the archive contains rows for other guilds ({table})")
+
+                await db.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    rows,
+                )
+                counts[table] = counts.get(table, 0) + len(rows)
+    finally:
+        await archive.close()
+
+    await db.settings.load(guild_id)
+    return guild_id, counts
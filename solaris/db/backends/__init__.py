@@ -0,0 +1,39 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+__all__ = ["BACKENDS", "Backend", "PostgresBackend", "SQLiteBackend", "SharedMemoryBackend", "get_backend"]
+
+import typing as t
+
+from .base import Backend
+from .postgres import PostgresBackend
+from .sqlite import SharedMemoryBackend, SQLiteBackend
+
+BACKENDS: t.Final = {
+    "sqlite": SQLiteBackend,
+    "shared-memory": SharedMemoryBackend,
+    "postgres": PostgresBackend,
+}
+
+
+def get_backend(db, name):
+    try:
+        return BACKENDS[name](db)
+    except KeyError:
+        raise ValueError(f"DB_BACKEND must be one of {', '.join(BACKENDS.keys())}") from None
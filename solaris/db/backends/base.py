@@ -0,0 +1,86 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class Backend(ABC):
+    # What `Database` needs from a storage engine. Writes always go through
+    # one connection so transactions can span several statements; reads
+    # may go anywhere, but must use that connection while it has a
+    # transaction open so they can see its writes.
+    dialect = None
+    supports_backups = False
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def schema_path(self):
+        # Where build.sql and the migrations directory for this dialect live.
+        return Path(self.db.bot._static)
+
+    def translate(self, sql):
+        return sql
+
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+    @property
+    @abstractmethod
+    def in_transaction(self):
+        pass
+
+    @abstractmethod
+    async def begin(self):
+        pass
+
+    @abstractmethod
+    async def commit(self):
+        pass
+
+    @abstractmethod
+    async def fetchone(self, sql, values):
+        pass
+
+    @abstractmethod
+    async def fetchall(self, sql, values):
+        pass
+
+    @abstractmethod
+    async def stream(self, sql, values, size):
+        pass
+
+    @abstractmethod
+    async def execute(self, sql, values):
+        pass
+
+    @abstractmethod
+    async def executemany(self, sql, valueset):
+        pass
+
+    @abstractmethod
+    async def executescript(self, script):
+        pass
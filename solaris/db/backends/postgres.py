@@ -0,0 +1,164 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import re
+from pathlib import Path
+
+from solaris import Config
+from solaris.db.backends.base import Backend
+
+_INSERT_OR_IGNORE = re.compile(r"^\s*INSERT OR IGNORE INTO", re.I)
+_INSERT_OR_REPLACE = re.compile(r"^\s*INSERT OR REPLACE INTO", re.I)
+
+
+def _placeholders(sql):
+    # sqlite's `?` placeholders become `$1`, `$2`, ... Anything inside a
+    # string literal is left alone.
+    parts = []
+    quoted = False
+    n = 0
+
+    for char in sql:
+        if char == "'":
+            quoted = not quoted
+        elif char == "?" and not quoted:
+            n += 1
+            char = f"${n}"
+        parts.append(char)
+
+    return "".join(parts)
+
+
+def _rowcount(status):
+    # asyncpg returns the command tag, such as "UPDATE 3" or "INSERT 0 1".
+    try:
+        return int(status.rsplit(" ", 1)[-1])
+    except (AttributeError, ValueError):
+        return -1
+
+
+class PostgresBackend(Backend):
+    # Talks to PostgreSQL through asyncpg. As with sqlite, every write goes
+    # through one dedicated connection, which keeps the transaction and
+    # savepoint handling in `Database` identical for both; reads are spread
+    # over the rest of the pool.
+    dialect = "postgres"
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._translated = {}
+
+    @property
+    def schema_path(self):
+        return Path(self.db.bot._static) / "postgres"
+
+    def translate(self, sql):
+        if (translated := self._translated.get(sql)) is None:
+            if _INSERT_OR_REPLACE.match(sql):
+                raise ValueError("INSERT OR REPLACE has no PostgreSQL equivalent; give the query a postgres override")
+
+            translated = sql
+            if _INSERT_OR_IGNORE.match(sql):
+                translated = f"{_INSERT_OR_IGNORE.sub('INSERT INTO', sql, 1)} ON CONFLICT DO NOTHING"
+
+            translated = self._translated[sql] = _placeholders(translated)
+
+        return translated
+
+    async def connect(self):
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("the postgres backend needs asyncpg to be installed") from None
+
+        if not Config.DB_URL:
+            raise RuntimeError("the postgres backend needs DB_URL to be set")
+
+        self.pool = await asyncpg.create_pool(
+            Config.DB_URL,
+            min_size=2,
+            max_size=max(Config.DB_READERS, 1) + 1,
+            statement_cache_size=Config.DB_STATEMENT_CACHE,
+        )
+        self.writer = await self.pool.acquire()
+
+    async def close(self):
+        await self.pool.release(self.writer)
+        await self.pool.close()
+
+    @property
+    def in_transaction(self):
+        return self.writer.is_in_transaction()
+
+    async def begin(self):
+        await self.writer.execute("BEGIN")
+
+    async def commit(self):
+        if self.writer.is_in_transaction():
+            await self.writer.execute("COMMIT")
+
+    async def _fetch(self, sql, values, method):
+        # Reads must see the writer's uncommitted rows, just like sqlite.
+        if self.writer.is_in_transaction():
+            return await getattr(self.writer, method)(self.translate(sql), *values)
+
+        async with self.pool.acquire() as cxn:
+            return await getattr(cxn, method)(self.translate(sql), *values)
+
+    async def fetchone(self, sql, values):
+        if (row := await self._fetch(sql, values, "fetchrow")) is not None:
+            return tuple(row)
+
+    async def fetchall(self, sql, values):
+        return [tuple(row) for row in await self._fetch(sql, values, "fetch")]
+
+    async def stream(self, sql, values, size):
+        if self.writer.is_in_transaction():
+            async for rows in self._stream(self.writer, sql, values, size):
+                yield rows
+            return
+
+        # Cursors only live as long as the transaction they were opened in.
+        async with self.pool.acquire() as cxn, cxn.transaction(readonly=True):
+            async for rows in self._stream(cxn, sql, values, size):
+                yield rows
+
+    async def _stream(self, cxn, sql, values, size):
+        cur = await cxn.cursor(self.translate(sql), *values)
+
+        while rows := await cur.fetch(size):
+            yield [tuple(row) for row in rows]
+
+    async def _begin_implicitly(self):
+        # sqlite3 opens a transaction before any write, and the durability
+        # policies rely on that; asyncpg would autocommit instead.
+        if not self.writer.is_in_transaction():
+            await self.begin()
+
+    async def execute(self, sql, values):
+        await self._begin_implicitly()
+        return _rowcount(await self.writer.execute(self.translate(sql), *values))
+
+    async def executemany(self, sql, valueset):
+        await self._begin_implicitly()
+        await self.writer.executemany(self.translate(sql), valueset)
+        return -1
+
+    async def executescript(self, script):
+        await self.writer.execute(script)
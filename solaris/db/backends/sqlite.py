@@ -0,0 +1,141 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+from itertools import cycle
+from os import makedirs, path
+
+from aiosqlite import connect
+
+from solaris import Config
+from solaris.db.backends.base import Backend
+
+
+class SQLiteBackend(Backend):
+    dialect = "sqlite"
+    supports_backups = True
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.path = f"{db.bot._dynamic}/database.db3"
+
+    async def _connect(self):
+        return await connect(self.path, cached_statements=Config.DB_STATEMENT_CACHE)
+
+    async def connect(self):
+        if not path.isdir(self.db.bot._dynamic):
+            # If this directory does not exist, we need to create it.
+            makedirs(self.db.bot._dynamic)
+
+        # All writes go through a single connection. WAL mode allows any
+        # number of readers to run alongside it without blocking.
+        self.writer = await self._connect()
+        await self.writer.execute("pragma journal_mode=wal")
+        # In WAL mode, NORMAL only loses data on power loss, not when the
+        # process dies, which is plenty for anything but immediate commits.
+        await self.writer.execute(
+            f"pragma synchronous = {'FULL' if Config.DB_DURABILITY == 'immediate' else 'NORMAL'}"
+        )
+
+        self.readers = []
+        for _ in range(max(Config.DB_READERS, 1)):
+            cxn = await self._connect()
+            await cxn.execute("pragma query_only = 1")
+            self.readers.append(cxn)
+        self._readers = cycle(self.readers)
+
+    async def close(self):
+        await self.writer.close()
+
+        for cxn in self.readers:
+            await cxn.close()
+
+    @property
+    def in_transaction(self):
+        return self.writer.in_transaction
+
+    @property
+    def reader(self):
+        # Readers can not see writes that have not been committed yet, so
+        # use the writer until the current transaction is closed.
+        if self.writer.in_transaction:
+            return self.writer
+
+        return next(self._readers)
+
+    async def begin(self):
+        await self.writer.execute("BEGIN")
+
+    async def commit(self):
+        await self.writer.commit()
+
+    async def fetchone(self, sql, values):
+        cur = await self.reader.execute(sql, values)
+        return await cur.fetchone()
+
+    async def fetchall(self, sql, values):
+        cur = await self.reader.execute(sql, values)
+        return await cur.fetchall()
+
+    async def stream(self, sql, values, size):
+        cur = await self.reader.execute(sql, values)
+
+        try:
+            while rows := await cur.fetchmany(size):
+                yield rows
+        finally:
+            await cur.close()
+
+    async def execute(self, sql, values):
+        cur = await self.writer.execute(sql, values)
+        return cur.rowcount
+
+    async def executemany(self, sql, valueset):
+        cur = await self.writer.executemany(sql, valueset)
+        return cur.rowcount
+
+    async def executescript(self, script):
+        await self.writer.executescript(script)
+
+
+class SharedMemoryBackend(SQLiteBackend):
+    # An in-memory database shared between every connection in the process.
+    # Nothing is written to disk, so it stands in for a server database
+    # when testing anything that runs more than one `Database` at once.
+    supports_backups = False
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.path = f"file:{Config.DB_URL or 'solaris'}?mode=memory&cache=shared"
+
+    async def _connect(self):
+        return await connect(self.path, uri=True, cached_statements=Config.DB_STATEMENT_CACHE)
+
+    async def connect(self):
+        # Shared-cache connections lock whole tables rather than using WAL,
+        # so readers are allowed to see uncommitted rows instead of waiting
+        # on the writer.
+        self.writer = await self._connect()
+
+        self.readers = []
+        for _ in range(max(Config.DB_READERS, 1)):
+            cxn = await self._connect()
+            await cxn.execute("pragma read_uncommitted = 1")
+            await cxn.execute("pragma query_only = 1")
+            self.readers.append(cxn)
+        self._readers = cycle(self.readers)
@@ -0,0 +1,125 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import datetime as dt
+import sqlite3
+import typing as t
+from asyncio import Lock, get_running_loop
+from pathlib import Path
+from time import perf_counter
+
+from solaris import Config
+
+# Seconds to wait between steps, so the copy never monopolises the disk.
+STEP_SLEEP: t.Final = 0.005
+# If the writer keeps changing pages under a stepped copy, it restarts
+# endlessly; past this many steps the rest is copied in one go.
+MAX_STEP_FACTOR: t.Final = 4
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManySteps(Exception):
+    pass
+
+
+class Backup:
+    __slots__ = ("path", "size", "duration", "steps", "integrity")
+
+    def __init__(self, path, size, duration, steps, integrity):
+        self.path = path
+        self.size = size
+        self.duration = duration
+        self.steps = steps
+        self.integrity = integrity
+
+    def __repr__(self):
+        return f"<Backup path={str(self.path)!r} size={self.size} duration={self.duration:.3f}>"
+
+
+def _copy(source, target, pages):
+    # Runs in a worker thread on its own pair of connections, so neither the
+    # writer nor the readers ever wait on it. In WAL mode each step only
+    # holds a read snapshot.
+    steps = 0
+
+    def _progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        if pages > 0 and steps > MAX_STEP_FACTOR * max(total // pages, 1):
+            raise _TooManySteps()
+
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=_progress, sleep=STEP_SLEEP)
+        except _TooManySteps:
+            src.backup(dst, pages=-1)
+            steps += 1
+
+        integrity = dst.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+    return steps, integrity
+
+
+class BackupManager:
+    def __init__(self, db):
+        self.db = db
+        self.path = Path(db.bot._dynamic) / "backups"
+        self.last: t.Optional[Backup] = None
+        self._lock = Lock()
+
+    @property
+    def backups(self):
+        return sorted(self.path.glob("database-*.db3"), reverse=True)
+
+    async def run(self):
+        if not self.db.backend.supports_backups:
+            raise BackupError(f"the {Config.DB_BACKEND} backend does not support online backups")
+
+        async with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            target = self.path / f"database-{dt.datetime.utcnow():%Y%m%d-%H%M%S}.db3"
+
+            # Anything buffered or uncommitted should be in the backup.
+            await self.db.commit()
+
+            start = perf_counter()
+            steps, integrity = await get_running_loop().run_in_executor(
+                None, _copy, self.db.backend.path, str(target), Config.DB_BACKUP_PAGES
+            )
+            duration = perf_counter() - start
+
+            if integrity != "ok":
+                target.unlink()
+                raise BackupError(f"the backup failed its integrity check ({integrity})")
+
+            self.last = Backup(target, target.stat().st_size, duration, steps, integrity)
+            self.rotate()
+            return self.last
+
+    def rotate(self):
+        for path in self.backups[max(Config.DB_BACKUP_KEEP, 1) :]:
+            path.unlink()
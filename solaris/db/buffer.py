@@ -0,0 +1,123 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import re
+import typing as t
+from asyncio import Lock
+
+from solaris import Config
+
+# table: (upsert query, delete query, lookup query)
+BUFFERED: t.Final = {
+    "entrants": ("add_entrant", "remove_entrant", "entrant"),
+    "accepted": ("add_accepted", "remove_accepted", "accepted"),
+}
+
+_TABLES = re.compile(r"\b({})\b".format("|".join(BUFFERED.keys())))
+
+
+class WriteBuffer:
+    # Coalesces single-row writes to the gateway tables into periodic
+    # `executemany` batches. Only the latest write to each (GuildID, UserID)
+    # pair is kept, so a member joining and leaving between flushes costs
+    # a single delete.
+    def __init__(self, db):
+        self.db = db
+        self._lock = Lock()
+        self._pending: t.Dict[t.Tuple[str, int, int], t.Optional[tuple]] = {}
+        self._inflight: t.Dict[t.Tuple[str, int, int], t.Optional[tuple]] = {}
+        self._pending_tables: t.Set[str] = set()
+        self._inflight_tables: t.Set[str] = set()
+        self._tables_in: t.Dict[str, t.FrozenSet[str]] = {}
+
+    async def upsert(self, table, guild_id, user_id, *values):
+        self._pending[(table, guild_id, user_id)] = (guild_id, user_id, *values)
+        self._pending_tables.add(table)
+        await self._maybe_flush()
+
+    async def delete(self, table, guild_id, user_id):
+        self._pending[(table, guild_id, user_id)] = None
+        self._pending_tables.add(table)
+        await self._maybe_flush()
+
+    async def exists(self, table, guild_id, user_id):
+        key = (table, guild_id, user_id)
+
+        for writes in (self._pending, self._inflight):
+            if key in writes:
+                return writes[key] is not None
+
+        # Nothing is buffered for this member, so the stored row is current
+        # and the rest of the buffer does not need flushing.
+        return await self.db._field(self.db.q[BUFFERED[table][2]].sql, guild_id, user_id) is not None
+
+    def dirty(self, sql):
+        if not (self._pending_tables or self._inflight_tables):
+            return False
+
+        if (tables := self._tables_in.get(sql)) is None:
+            tables = self._tables_in[sql] = frozenset(_TABLES.findall(sql))
+
+        return not tables.isdisjoint(self._pending_tables | self._inflight_tables)
+
+    async def _maybe_flush(self):
+        if len(self._pending) >= Config.DB_WRITE_BUFFER_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            if self._inflight:
+                # Nothing new to write, but callers still expect a flush
+                # that is already under way to have finished.
+                async with self._lock:
+                    pass
+            return
+
+        # The writer is always locked before the buffer, never the other
+        # way round, so a transaction that needs a flush can't deadlock
+        # against one already running.
+        async with self.db._transaction(), self._lock:
+            if not self._pending:
+                return
+
+            self._inflight, self._pending = self._pending, {}
+            self._inflight_tables, self._pending_tables = self._pending_tables, set()
+            batches = {}
+
+            for (table, guild_id, user_id), values in self._inflight.items():
+                upsert, delete, _ = BUFFERED[table]
+                if values is None:
+                    batches.setdefault(delete, []).append((guild_id, user_id))
+                else:
+                    batches.setdefault(upsert, []).append(values)
+
+            try:
+                for name, valueset in batches.items():
+                    await self.db._executemany(self.db.q[name].sql, valueset)
+            except Exception:
+                # Anything written since the flush started is newer.
+                self._pending = {**self._inflight, **self._pending}
+                self._pending_tables |= self._inflight_tables
+                raise
+            finally:
+                self._inflight = {}
+                self._inflight_tables = set()
+
+    def __len__(self):
+        return len(self._pending)
@@ -17,100 +17,286 @@
 # Ethan Henderson
 # parafoxia@carberra.xyz
 
-from os import path
+import typing as t
+from asyncio import Lock, create_task, get_running_loop
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from time import perf_counter
 
-from aiosqlite import connect
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from solaris import Config
+from solaris.db.backends import get_backend
+from solaris.db.backup import BackupManager
+from solaris.db.buffer import WriteBuffer
+from solaris.db.migrations import Migrator
+from solaris.db.queries import GUILD_TABLES, QueryRegistry
+from solaris.db.settings import SettingsCache
+from solaris.db.stats import DatabaseStats
+
+DURABILITY_POLICIES: t.Final = ("immediate", "grouped", "periodic")
+
+# How many transactions the current task has open on the writer.
+_depth: ContextVar[int] = ContextVar("_depth", default=0)
 
 
 class Database:
     def __init__(self, bot):
         self.bot = bot
-        self.db_path = f"{self.bot._dynamic}/database.db3"
-        self.build_path = f"{self.bot._static}/build.sql"
-        self._calls = 0
+        self.backend = get_backend(self, Config.DB_BACKEND)
+        self.stats = DatabaseStats()
+        self.q = QueryRegistry(self)
+        self.settings = SettingsCache(self)
+        self.buffer = WriteBuffer(self)
+        self.migrator = Migrator(self)
+        self.backups = BackupManager(self)
+        self._lock = Lock()
+        self._grouped_commit = None
 
-        self.bot.scheduler.add_job(self.commit, CronTrigger(second=0))
+        if Config.DB_DURABILITY not in DURABILITY_POLICIES:
+            raise ValueError(f"DB_DURABILITY must be one of {', '.join(DURABILITY_POLICIES)}")
 
-    async def connect(self):
-        if not path.isdir(self.bot._dynamic):
-            # If this directory does not exist, we need to create it.
-            from os import makedirs
+        if Config.DB_DURABILITY == "periodic":
+            self.bot.scheduler.add_job(self.commit, IntervalTrigger(seconds=Config.DB_COMMIT_INTERVAL / 1000))
+
+        self.bot.scheduler.add_job(self.stamp, CronTrigger(second=0))
 
-            makedirs(self.bot._dynamic)
+        if Config.DB_BACKUP_INTERVAL > 0 and self.backend.supports_backups:
+            self.bot.scheduler.add_job(self.backups.run, IntervalTrigger(hours=Config.DB_BACKUP_INTERVAL))
+        self.bot.scheduler.add_job(self.buffer.flush, IntervalTrigger(seconds=Config.DB_WRITE_BUFFER_INTERVAL))
 
-        self.cxn = await connect(self.db_path)
-        await self.execute("pragma journal_mode=wal")
-        await self.executescript(self.build_path)
+    async def connect(self):
+        await self.backend.connect()
+
+        for migration in await self.migrator.run():
+            print(f" Applied migration {migration.version:04} ({migration.name}).")
         await self.commit()
 
+    async def stamp(self):
+        # Synchronise.on_boot only re-checks members who joined after this
+        # time, so it must never be ahead of what has actually been
+        # committed, nor move on while the boot sync is still running.
+        if self.bot.ready.ok and not getattr(self.bot.get_cog("Gateway"), "syncing", None):
+            await self.q.touch_last_commit()
+
     async def commit(self):
-        if self.bot.ready.ok:
-            await self.execute("UPDATE bot SET Value = CURRENT_TIMESTAMP WHERE Key = 'last commit'")
+        await self.buffer.flush()
+
+        if _depth.get():
+            # The outermost transaction decides when to commit.
+            return
+
+        async with self._lock:
+            await self.backend.commit()
+
+    @asynccontextmanager
+    async def transaction(self):
+        if not _depth.get():
+            # Buffered writes are flushed first so they are never rolled
+            # back along with this transaction.
+            await self.buffer.flush()
+
+        async with self._transaction():
+            yield self
+
+    @asynccontextmanager
+    async def _transaction(self):
+        if depth := _depth.get():
+            async with self._savepoint(depth):
+                yield
+            return
+
+        async with self._lock:
+            if not self.backend.in_transaction:
+                await self.backend.begin()
+
+            async with self._savepoint(0):
+                yield
+
+        await self._written()
+
+    @asynccontextmanager
+    async def _savepoint(self, depth):
+        # Savepoints leave any earlier uncommitted writes alone if this
+        # transaction is rolled back.
+        name = f"sp{depth}"
+        token = _depth.set(depth + 1)
+        await self.backend.execute(f"SAVEPOINT {name}", ())
+
+        try:
+            yield
+        except BaseException:
+            await self.backend.execute(f"ROLLBACK TO {name}", ())
+            await self.backend.execute(f"RELEASE {name}", ())
+            raise
+        else:
+            await self.backend.execute(f"RELEASE {name}", ())
+        finally:
+            _depth.reset(token)
+
+    @asynccontextmanager
+    async def _writing(self):
+        if _depth.get():
+            yield
+        else:
+            async with self._lock:
+                yield
+            await self._written()
+
+    async def _written(self):
+        if Config.DB_DURABILITY == "immediate":
+            await self.commit()
+        elif Config.DB_DURABILITY == "grouped" and self._grouped_commit is None:
+            self._grouped_commit = get_running_loop().call_later(
+                Config.DB_COMMIT_INTERVAL / 1000, lambda: create_task(self._commit_group())
+            )
 
-        await self.cxn.commit()
+    async def _commit_group(self):
+        self._grouped_commit = None
+        await self.commit()
 
     async def close(self):
+        if self._grouped_commit is not None:
+            self._grouped_commit.cancel()
+
+        await self.stamp()
         await self.commit()
-        await self.cxn.close()
+        await self.backend.close()
 
     async def sync(self):
-        # Insert.
-        await self.executemany("INSERT OR IGNORE INTO system (GuildID) VALUES (?)", [(g.id,) for g in self.bot.guilds])
-        await self.executemany(
-            "INSERT OR IGNORE INTO gateway (GuildID) VALUES (?)", [(g.id,) for g in self.bot.guilds]
-        )
-        await self.executemany("INSERT OR IGNORE INTO warn (GuildID) VALUES (?)", [(g.id,) for g in self.bot.guilds])
-
-        # Remove.
-        stored = await self.column("SELECT GuildID FROM system")
-        member_of = [g.id for g in self.bot.guilds]
-        removals = [(g_id,) for g_id in set(stored) - set(member_of)]
-        await self.executemany("DELETE FROM system WHERE GuildID = ?", removals)
-        await self.executemany("DELETE FROM gateway WHERE GuildID = ?", removals)
-        await self.executemany("DELETE FROM warn WHERE GuildID = ?", removals)
+        async with self.transaction():
+            # Stage the current guild IDs so the reconciliation can be done
+            # in SQL rather than by diffing in Python.
+            await self.q.create_guild_stage()
+            await self.q.clear_guild_stage()
+            await self.q.stage_guild.many([(g.id,) for g in self.bot.guilds])
+
+            # Insert.
+            await self.q.add_staged_system_rows()
+            await self.q.add_staged_gateway_rows()
+            await self.q.add_staged_warn_rows()
+
+            # Remove.
+            for table in GUILD_TABLES:
+                await self.q[f"prune_{table}"]()
+
+            await self.q.drop_guild_stage()
 
         # Commit.
         await self.commit()
 
+        # Cache.
+        self.settings.clear()
+        await self.settings.load()
+
+    async def remove_guild(self, guild_id):
+        async with self.transaction():
+            await self.q.remove_system_row(guild_id)
+            await self.q.remove_gateway_row(guild_id)
+            await self.q.clear_gateway_roles(guild_id)
+            await self.q.clear_entrants(guild_id)
+            await self.q.clear_accepted(guild_id)
+            await self.q.remove_warn_row(guild_id)
+            await self.q.clear_warn_types(guild_id)
+            await self.q.clear_guild_warnings(guild_id)
+            await self.q.clear_jobs(guild_id)
+
+        self.settings.remove(guild_id)
+
     async def field(self, sql, *values):
-        cur = await self.cxn.execute(sql, tuple(values))
-        self._calls += 1
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
+
+        return await self._field(sql, *values)
+
+    async def _field(self, sql, *values):
+        start = perf_counter()
+        row = await self.backend.fetchone(sql, values)
+        self.stats.record(sql, perf_counter() - start, returned=row is not None)
 
-        if (row := await cur.fetchone()) is not None:
+        if row is not None:
             return row[0]
 
     async def record(self, sql, *values):
-        cur = await self.cxn.execute(sql, tuple(values))
-        self._calls += 1
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
 
-        return await cur.fetchone()
+        start = perf_counter()
+        row = await self.backend.fetchone(sql, values)
+        self.stats.record(sql, perf_counter() - start, returned=row is not None)
+
+        return row
 
     async def records(self, sql, *values):
-        cur = await self.cxn.execute(sql, tuple(values))
-        self._calls += 1
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
+
+        start = perf_counter()
+        rows = await self.backend.fetchall(sql, values)
+        self.stats.record(sql, perf_counter() - start, returned=len(rows))
 
-        return await cur.fetchall()
+        return rows
 
     async def column(self, sql, *values):
-        cur = await self.cxn.execute(sql, tuple(values))
-        self._calls += 1
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
+
+        start = perf_counter()
+        rows = await self.backend.fetchall(sql, values)
+        self.stats.record(sql, perf_counter() - start, returned=len(rows))
+
+        return [row[0] for row in rows]
+
+    async def stream(self, sql, *values, size=1000):
+        # Yields the results in chunks so large result sets never have to
+        # be held in memory all at once.
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
 
-        return [row[0] for row in await cur.fetchall()]
+        start = perf_counter()
+        returned = 0
+
+        try:
+            async for rows in self.backend.stream(sql, values, size):
+                returned += len(rows)
+                yield rows
+        finally:
+            self.stats.record(sql, perf_counter() - start, returned=returned)
 
     async def execute(self, sql, *values):
-        cur = await self.cxn.execute(sql, tuple(values))
-        self._calls += 1
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
+
+        async with self._writing():
+            start = perf_counter()
+            rowcount = await self.backend.execute(sql, values)
+            self.stats.record(sql, perf_counter() - start, affected=rowcount)
 
-        return cur.rowcount
+        return rowcount
 
     async def executemany(self, sql, valueset):
-        cur = await self.cxn.executemany(sql, valueset)
-        self._calls += 1  # NOTE: Should this be `len(valueset)`?
+        if self.buffer.dirty(sql):
+            await self.buffer.flush()
+
+        return await self._executemany(sql, valueset)
 
-        return cur.rowcount
+    async def _executemany(self, sql, valueset):
+        # Counted as a single call; the number of rows it touched is
+        # tracked separately.
+        async with self._writing():
+            start = perf_counter()
+            rowcount = await self.backend.executemany(sql, valueset)
+            self.stats.record(sql, perf_counter() - start, affected=rowcount)
+
+        return rowcount
 
     async def executescript(self, path):
         with open(path, "r", encoding="utf-8") as script:
-            await self.cxn.executescript(script.read())
-        self._calls += 1  # NOTE: Should this be different?
+            await self.runscript(script.read(), label=path)
+
+    async def runscript(self, script, label="script"):
+        async with self._writing():
+            start = perf_counter()
+            await self.backend.executescript(script)
+        self.stats.record(f"-- {label}", perf_counter() - start)
@@ -0,0 +1,101 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import re
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+class Migration:
+    __slots__ = ("version", "name", "path")
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def __repr__(self):
+        return f"<Migration version={self.version} name={self.name!r}>"
+
+
+class Migrator:
+    def __init__(self, db):
+        self.db = db
+        self.path = db.backend.schema_path / "migrations"
+
+    @property
+    def migrations(self):
+        migrations = []
+
+        for p in self.path.glob("*.sql"):
+            if (match := _FILENAME.match(p.name)) is None:
+                raise ValueError(f"migration file names must look like 0001_name.sql, not {p.name!r}")
+
+            migrations.append(Migration(int(match.group(1)), match.group(2), p))
+
+        migrations.sort(key=lambda m: m.version)
+
+        if len(versions := [m.version for m in migrations]) != len(set(versions)):
+            raise ValueError("two migrations share a version number")
+
+        return migrations
+
+    async def version(self):
+        if not await self.db.q.has_table("bot"):
+            return None
+
+        if (version := await self.db.q.schema_version()) is not None:
+            return int(version)
+
+    async def run(self):
+        if (version := await self.version()) is None:
+            # A new database, or one that predates migrations. build.sql only
+            # creates what does not already exist, so both are safe.
+            await self.db.executescript(self.db.backend.schema_path / "build.sql")
+            await self.db.q.set_schema_version(str(version := 0))
+
+        applied = []
+
+        for migration in self.migrations:
+            if migration.version <= version:
+                continue
+
+            with open(migration.path, "r", encoding="utf-8") as f:
+                script = f.read()
+
+            # The version bump shares the migration's transaction, so a
+            # failed migration is retried in full on the next boot.
+            try:
+                await self.db.runscript(
+                    f"BEGIN;\n{script}\n"
+                    f"UPDATE bot SET Value = '{migration.version}' WHERE Key = 'schema version';\nCOMMIT;",
+                    label=f"migration {migration.version:04}",
+                )
+            except Exception:
+                # A script that fails part way leaves its transaction open,
+                # and the next commit would keep what it had already done.
+                # This can't go through `runscript`, as SQLite commits
+                # before running a script.
+                if self.db.backend.in_transaction:
+                    await self.db.backend.execute("ROLLBACK", ())
+                raise
+
+            applied.append(migration)
+
+        return applied
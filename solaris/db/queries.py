@@ -0,0 +1,326 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import typing as t
+
+# Every table keyed by GuildID.
+GUILD_TABLES: t.Final = (
+    "system",
+    "gateway",
+    "gateway_roles",
+    "entrants",
+    "accepted",
+    "warn",
+    "warntypes",
+    "warns",
+    "jobs",
+)
+
+
+class Query:
+    __slots__ = ("name", "method", "sql", "postgres")
+
+    def __init__(self, name, method, sql, postgres=None):
+        self.name = name
+        self.method = method
+        self.sql = sql
+        # Only needed where the sqlite statement can not be translated
+        # mechanically (see PostgresBackend.translate).
+        self.postgres = postgres
+
+    def for_dialect(self, dialect):
+        if dialect == "postgres" and self.postgres is not None:
+            return self.postgres
+
+        return self.sql
+
+    def __repr__(self):
+        return f"<Query name={self.name!r} method={self.method!r}>"
+
+
+# Every statement Solaris runs lives here. sqlite caches compiled statements
+# per connection keyed by their text, so keeping them constant means each is
+# only ever parsed once per connection.
+_PG_NOW: t.Final = "to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS')"
+
+QUERIES: t.Final = {
+    q.name: q
+    for q in (
+        # bot
+        Query("last_commit", "field", "SELECT Value FROM bot WHERE Key = 'last commit'"),
+        Query(
+            "touch_last_commit",
+            "execute",
+            "UPDATE bot SET Value = CURRENT_TIMESTAMP WHERE Key = 'last commit'",
+            f"UPDATE bot SET Value = {_PG_NOW} WHERE Key = 'last commit'",
+        ),
+        Query("schema_version", "field", "SELECT Value FROM bot WHERE Key = 'schema version'"),
+        Query(
+            "set_schema_version",
+            "execute",
+            "INSERT OR REPLACE INTO bot VALUES ('schema version', ?)",
+            "INSERT INTO bot VALUES ('schema version', $1) ON CONFLICT (Key) DO UPDATE SET Value = EXCLUDED.Value",
+        ),
+        Query(
+            "has_table",
+            "field",
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = current_schema() "
+            "AND table_name = lower($1)",
+        ),
+        Query(
+            "table_columns",
+            "column",
+            "SELECT name FROM pragma_table_info(?)",
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() "
+            "AND table_name = lower($1) ORDER BY ordinal_position",
+        ),
+        # sync
+        Query(
+            "create_guild_stage",
+            "execute",
+            "CREATE TEMP TABLE IF NOT EXISTS guild_stage (GuildID integer PRIMARY KEY)",
+            "CREATE TEMP TABLE IF NOT EXISTS guild_stage (GuildID bigint PRIMARY KEY)",
+        ),
+        Query("clear_guild_stage", "execute", "DELETE FROM guild_stage"),
+        Query("stage_guild", "execute", "INSERT OR IGNORE INTO guild_stage VALUES (?)"),
+        Query("drop_guild_stage", "execute", "DROP TABLE IF EXISTS guild_stage"),
+        Query(
+            "add_staged_system_rows",
+            "execute",
+            "INSERT OR IGNORE INTO system (GuildID) SELECT GuildID FROM guild_stage",
+        ),
+        Query(
+            "add_staged_gateway_rows",
+            "execute",
+            "INSERT OR IGNORE INTO gateway (GuildID) SELECT GuildID FROM guild_stage",
+        ),
+        Query(
+            "add_staged_warn_rows",
+            "execute",
+            "INSERT OR IGNORE INTO warn (GuildID) SELECT GuildID FROM guild_stage",
+        ),
+        *(
+            Query(
+                f"prune_{table}",
+                "execute",
+                f"DELETE FROM {table} WHERE GuildID NOT IN (SELECT GuildID FROM guild_stage)",
+            )
+            for table in GUILD_TABLES
+        ),
+        # errors
+        Query("add_error", "execute", "INSERT INTO errors (Ref, Cause, Traceback) VALUES (?, ?, ?)"),
+        Query("error", "record", "SELECT Cause, ErrorTime, Traceback FROM errors WHERE Ref = ?"),
+        # system
+        Query("add_system_row", "execute", "INSERT OR IGNORE INTO system (GuildID) VALUES (?)"),
+        Query("remove_system_row", "execute", "DELETE FROM system WHERE GuildID = ?"),
+        Query(
+            "system_rows",
+            "records",
+            "SELECT GuildID, RunFTS, Prefix, DefaultLogChannelID, LogChannelID, DefaultAdminRoleID, AdminRoleID "
+            "FROM system",
+        ),
+        Query(
+            "system_row",
+            "records",
+            "SELECT GuildID, RunFTS, Prefix, DefaultLogChannelID, LogChannelID, DefaultAdminRoleID, AdminRoleID "
+            "FROM system WHERE GuildID = ?",
+        ),
+        # gateway
+        Query("add_gateway_row", "execute", "INSERT OR IGNORE INTO gateway (GuildID) VALUES (?)"),
+        Query("remove_gateway_row", "execute", "DELETE FROM gateway WHERE GuildID = ?"),
+        Query(
+            "gateway_rows",
+            "records",
+            "SELECT GuildID, Active, RulesChannelID, GateMessageID, BlockingRoleID, "
+            "WelcomeChannelID, GoodbyeChannelID, Timeout, GateText, WelcomeText, WelcomeBotText, GoodbyeText, "
+            "GoodbyeBotText FROM gateway",
+        ),
+        Query(
+            "gateway_row",
+            "records",
+            "SELECT GuildID, Active, RulesChannelID, GateMessageID, BlockingRoleID, "
+            "WelcomeChannelID, GoodbyeChannelID, Timeout, GateText, WelcomeText, WelcomeBotText, GoodbyeText, "
+            "GoodbyeBotText FROM gateway WHERE GuildID = ?",
+        ),
+        Query("active_gateways", "column", "SELECT GuildID FROM gateway WHERE Active = 1"),
+        # gateway_roles
+        Query("gateway_role_rows", "records", "SELECT GuildID, Kind, RoleID FROM gateway_roles"),
+        Query("gateway_role_row", "records", "SELECT GuildID, Kind, RoleID FROM gateway_roles WHERE GuildID = ?"),
+        Query("add_gateway_role", "execute", "INSERT OR IGNORE INTO gateway_roles VALUES (?, ?, ?)"),
+        Query("clear_gateway_roles", "execute", "DELETE FROM gateway_roles WHERE GuildID = ?"),
+        Query("clear_gateway_roles_of_kind", "execute", "DELETE FROM gateway_roles WHERE GuildID = ? AND Kind = ?"),
+        # entrants
+        Query(
+            "add_entrant",
+            "execute",
+            "INSERT OR REPLACE INTO entrants VALUES (?, ?, ?)",
+            "INSERT INTO entrants VALUES ($1, $2, $3) "
+            "ON CONFLICT (GuildID, UserID) DO UPDATE SET Timeout = EXCLUDED.Timeout",
+        ),
+        Query("remove_entrant", "execute", "DELETE FROM entrants WHERE GuildID = ? AND UserID = ?"),
+        Query("clear_entrants", "execute", "DELETE FROM entrants WHERE GuildID = ?"),
+        Query("entrant", "field", "SELECT UserID FROM entrants WHERE GuildID = ? AND UserID = ?"),
+        Query("entrant_ids", "column", "SELECT UserID FROM entrants WHERE GuildID = ?"),
+        Query(
+            "grouped_entrants",
+            "records",
+            "SELECT GuildID, GROUP_CONCAT(UserID) FROM entrants GROUP BY GuildID",
+            "SELECT GuildID, string_agg(UserID::text, ',') FROM entrants GROUP BY GuildID",
+        ),
+        Query("entrant_timeouts", "records", "SELECT GuildID, UserID, Timeout FROM entrants"),
+        Query("guild_entrant_timeouts", "records", "SELECT UserID, Timeout FROM entrants WHERE GuildID = ?"),
+        Query(
+            "reset_entrant_timeouts",
+            "execute",
+            "UPDATE entrants SET Timeout = datetime('now', '+3600 seconds')",
+            "UPDATE entrants SET Timeout = "
+            "to_char(now() AT TIME ZONE 'utc' + interval '3600 seconds', 'YYYY-MM-DD HH24:MI:SS')",
+        ),
+        # accepted
+        Query("add_accepted", "execute", "INSERT OR IGNORE INTO accepted VALUES (?, ?)"),
+        Query("remove_accepted", "execute", "DELETE FROM accepted WHERE GuildID = ? AND UserID = ?"),
+        Query("clear_accepted", "execute", "DELETE FROM accepted WHERE GuildID = ?"),
+        Query("accepted", "field", "SELECT UserID FROM accepted WHERE GuildID = ? AND UserID = ?"),
+        Query("accepted_ids", "column", "SELECT UserID FROM accepted WHERE GuildID = ?"),
+        Query(
+            "grouped_accepted",
+            "records",
+            "SELECT GuildID, GROUP_CONCAT(UserID) FROM accepted GROUP BY GuildID",
+            "SELECT GuildID, string_agg(UserID::text, ',') FROM accepted GROUP BY GuildID",
+        ),
+        # warn
+        Query("add_warn_row", "execute", "INSERT OR IGNORE INTO warn (GuildID) VALUES (?)"),
+        Query("remove_warn_row", "execute", "DELETE FROM warn WHERE GuildID = ?"),
+        Query("warn_rows", "records", "SELECT GuildID, WarnRoleID, MaxPoints, MaxStrikes, RetroUpdates FROM warn"),
+        Query(
+            "warn_row",
+            "records",
+            "SELECT GuildID, WarnRoleID, MaxPoints, MaxStrikes, RetroUpdates FROM warn WHERE GuildID = ?",
+        ),
+        # warntypes
+        Query("warn_types", "records", "SELECT WarnType, Points FROM warntypes WHERE GuildID = ?"),
+        Query("warn_type_names", "column", "SELECT WarnType FROM warntypes WHERE GuildID = ?"),
+        Query("warn_type_points", "field", "SELECT Points FROM warntypes WHERE GuildID = ? AND WarnType = ?"),
+        Query("add_warn_type", "execute", "INSERT INTO warntypes (GuildID, WarnType, Points) VALUES (?, ?, ?)"),
+        Query("rename_warn_type", "execute", "UPDATE warntypes SET WarnType = ? WHERE GuildID = ? AND WarnType = ?"),
+        Query("repoint_warn_type", "execute", "UPDATE warntypes SET Points = ? WHERE GuildID = ? AND WarnType = ?"),
+        Query("remove_warn_type", "execute", "DELETE FROM warntypes WHERE GuildID = ? AND WarnType = ?"),
+        Query("clear_warn_types", "execute", "DELETE FROM warntypes WHERE GuildID = ?"),
+        # warns
+        Query(
+            "add_warning",
+            "execute",
+            "INSERT INTO warns (WarnID, GuildID, UserID, ModID, WarnType, Points, Comment) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ),
+        Query("remove_warning", "execute", "DELETE FROM warns WHERE WarnID = ?"),
+        Query("clear_guild_warnings", "execute", "DELETE FROM warns WHERE GuildID = ?"),
+        Query("clear_warnings", "execute", "DELETE FROM warns WHERE GuildID = ? AND UserID = ?"),
+        Query("clear_warnings_of_type", "execute", "DELETE FROM warns WHERE GuildID = ? AND WarnType = ?"),
+        Query("warning_points", "records", "SELECT WarnType, Points FROM warns WHERE GuildID = ? AND UserID = ?"),
+        Query(
+            "warnings",
+            "records",
+            "SELECT WarnID, ModID, WarnTime, WarnType, Points, Comment FROM warns "
+            "WHERE GuildID = ? AND UserID = ? ORDER BY WarnTime DESC",
+        ),
+        Query("rename_warnings", "execute", "UPDATE warns SET WarnType = ? WHERE GuildID = ? AND WarnType = ?"),
+        Query(
+            "repoint_warnings",
+            "execute",
+            "UPDATE warns SET Points = ? WHERE GuildID = ? AND WarnType = ? AND Points = ?",
+        ),
+        Query(
+            "rename_and_repoint_warnings",
+            "execute",
+            "UPDATE warns SET WarnType = ?, Points = ? WHERE GuildID = ? AND WarnType = ? AND Points = ?",
+        ),
+        # jobs
+        Query(
+            "jobs_of_kind",
+            "records",
+            "SELECT GuildID, ChannelID, MessageID, Cursor, Checked, Changed, Options FROM jobs WHERE Kind = ?",
+        ),
+        Query(
+            "add_job",
+            "execute",
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO jobs VALUES ($1, $2, $3, $4, $5, $6, $7, $8) ON CONFLICT (GuildID, Kind) DO UPDATE SET "
+            "ChannelID = EXCLUDED.ChannelID, MessageID = EXCLUDED.MessageID, Cursor = EXCLUDED.Cursor, "
+            "Checked = EXCLUDED.Checked, Changed = EXCLUDED.Changed, Options = EXCLUDED.Options",
+        ),
+        Query(
+            "checkpoint_job",
+            "execute",
+            "UPDATE jobs SET MessageID = ?, Cursor = ?, Checked = ?, Changed = ? WHERE GuildID = ? AND Kind = ?",
+        ),
+        Query(
+            "job",
+            "record",
+            "SELECT MessageID, Cursor, Checked, Changed, Options FROM jobs WHERE GuildID = ? AND Kind = ?",
+        ),
+        Query(
+            "stage_job",
+            "execute",
+            "UPDATE jobs SET Cursor = ?, Checked = ?, Changed = ?, Options = ? WHERE GuildID = ? AND Kind = ?",
+        ),
+        Query("remove_job", "execute", "DELETE FROM jobs WHERE GuildID = ? AND Kind = ?"),
+        Query("clear_jobs", "execute", "DELETE FROM jobs WHERE GuildID = ?"),
+    )
+}
+
+
+class BoundQuery:
+    __slots__ = ("db", "query", "sql")
+
+    def __init__(self, db, query, sql):
+        self.db = db
+        self.query = query
+        self.sql = sql
+
+    async def __call__(self, *values):
+        return await getattr(self.db, self.query.method)(self.sql, *values)
+
+    async def many(self, valueset):
+        return await self.db.executemany(self.sql, valueset)
+
+    def __repr__(self):
+        return f"<BoundQuery name={self.query.name!r} method={self.query.method!r}>"
+
+
+class QueryRegistry:
+    def __init__(self, db):
+        self.db = db
+        dialect = db.backend.dialect
+        self._bound = {name: BoundQuery(db, query, query.for_dialect(dialect)) for name, query in QUERIES.items()}
+
+    def __getattr__(self, name):
+        try:
+            return self._bound[name]
+        except KeyError:
+            raise AttributeError(f"no query named {name!r} is registered") from None
+
+    def __getitem__(self, name):
+        return self._bound[name]
+
+    def __contains__(self, name):
+        return name in self._bound
+
+    def __len__(self):
+        return len(self._bound)
@@ -0,0 +1,153 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import typing as t
+from dataclasses import dataclass, field, fields
+
+
+def column(name, default=None):
+    return field(default=default, metadata={"column": name})
+
+
+@dataclass
+class SystemSettings:
+    run_fts: int = column("RunFTS", 0)
+    # No row means no prefix, so callers fall back to Config.DEFAULT_PREFIX.
+    prefix: t.Optional[str] = column("Prefix")
+    default_log_channel_id: t.Optional[int] = column("DefaultLogChannelID")
+    log_channel_id: t.Optional[int] = column("LogChannelID")
+    default_admin_role_id: t.Optional[int] = column("DefaultAdminRoleID")
+    admin_role_id: t.Optional[int] = column("AdminRoleID")
+
+
+@dataclass
+class GatewaySettings:
+    active: int = column("Active", 0)
+    rules_channel_id: t.Optional[int] = column("RulesChannelID")
+    gate_message_id: t.Optional[int] = column("GateMessageID")
+    blocking_role_id: t.Optional[int] = column("BlockingRoleID")
+    welcome_channel_id: t.Optional[int] = column("WelcomeChannelID")
+    goodbye_channel_id: t.Optional[int] = column("GoodbyeChannelID")
+    timeout: t.Optional[int] = column("Timeout")
+    gate_text: t.Optional[str] = column("GateText")
+    welcome_text: t.Optional[str] = column("WelcomeText")
+    welcome_bot_text: t.Optional[str] = column("WelcomeBotText")
+    goodbye_text: t.Optional[str] = column("GoodbyeText")
+    goodbye_bot_text: t.Optional[str] = column("GoodbyeBotText")
+    # Stored in `gateway_roles` rather than the `gateway` table.
+    member_role_ids: t.FrozenSet[int] = frozenset()
+    exception_role_ids: t.FrozenSet[int] = frozenset()
+
+
+@dataclass
+class WarnSettings:
+    warn_role_id: t.Optional[int] = column("WarnRoleID")
+    max_points: t.Optional[int] = column("MaxPoints")
+    max_strikes: t.Optional[int] = column("MaxStrikes")
+    retro_updates: int = column("RetroUpdates", 0)
+
+
+@dataclass
+class GuildSettings:
+    guild_id: int
+    system: SystemSettings = field(default_factory=SystemSettings)
+    gateway: GatewaySettings = field(default_factory=GatewaySettings)
+    warn: WarnSettings = field(default_factory=WarnSettings)
+
+
+TABLES: t.Final = {"system": SystemSettings, "gateway": GatewaySettings, "warn": WarnSettings}
+ROLE_KINDS: t.Final = {"member": "member_role_ids", "exception": "exception_role_ids"}
+
+
+def _columns(table):
+    return {f.name: f.metadata["column"] for f in fields(TABLES[table]) if "column" in f.metadata}
+
+
+class SettingsCache:
+    # A write-through cache of the `system`, `gateway`, and `warn`
+    # tables. Reads never touch the database once a guild is cached.
+    def __init__(self, db):
+        self.db = db
+        self._guilds: t.Dict[int, GuildSettings] = {}
+
+    async def load(self, guild_id=None):
+        for table in TABLES.keys():
+            names = tuple(_columns(table).keys())
+
+            if guild_id is None:
+                records = await self.db.q[f"{table}_rows"]()
+            else:
+                records = await self.db.q[f"{table}_row"](guild_id)
+
+            for g_id, *values in records:
+                settings = self._guilds.setdefault(g_id, GuildSettings(g_id))
+                setattr(settings, table, TABLES[table](**dict(zip(names, values))))
+
+        if guild_id is None:
+            records = await self.db.q.gateway_role_rows()
+        else:
+            records = await self.db.q.gateway_role_row(guild_id)
+
+        roles = {}
+        for g_id, kind, role_id in records:
+            roles.setdefault((g_id, kind), set()).add(role_id)
+
+        for (g_id, kind), role_ids in roles.items():
+            if (settings := self._guilds.get(g_id)) is not None:
+                setattr(settings.gateway, ROLE_KINDS[kind], frozenset(role_ids))
+
+    async def get(self, guild_id):
+        if (settings := self._guilds.get(guild_id)) is None:
+            # Guilds joined while Solaris was booting may not be cached yet.
+            await self.load(guild_id)
+            settings = self._guilds.setdefault(guild_id, GuildSettings(guild_id))
+
+        return settings
+
+    async def update(self, guild_id, table, **values):
+        columns = _columns(table)
+        await self.db.execute(
+            "UPDATE {} SET {} WHERE GuildID = ?".format(table, ", ".join(f"{columns[k]} = ?" for k in values.keys())),
+            *values.values(),
+            guild_id,
+        )
+
+        settings = await self.get(guild_id)
+        for key, value in values.items():
+            setattr(getattr(settings, table), key, value)
+
+    async def set_roles(self, guild_id, kind, role_ids):
+        async with self.db.transaction():
+            await self.db.q.clear_gateway_roles_of_kind(guild_id, kind)
+            await self.db.q.add_gateway_role.many([(guild_id, kind, role_id) for role_id in role_ids])
+
+        settings = await self.get(guild_id)
+        setattr(settings.gateway, ROLE_KINDS[kind], frozenset(role_ids))
+
+    def remove(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    def clear(self):
+        self._guilds.clear()
+
+    def __contains__(self, guild_id):
+        return guild_id in self._guilds
+
+    def __len__(self):
+        return len(self._guilds)
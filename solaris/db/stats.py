@@ -0,0 +1,137 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import re
+import typing as t
+from collections import deque
+from time import time
+
+SAMPLE_SIZE: t.Final = 1024
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise(sql):
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class QueryStats:
+    __slots__ = ("sql", "count", "total", "samples", "returned", "affected")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        # Only the most recent samples are kept, so percentiles reflect
+        # current behaviour rather than the whole uptime.
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.returned = 0
+        self.affected = 0
+
+    def add(self, elapsed, returned, affected):
+        self.count += 1
+        self.total += elapsed
+        self.samples.append(elapsed)
+        self.returned += returned
+        self.affected += max(affected, 0)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p50(self):
+        return _percentile(self.samples, 50)
+
+    @property
+    def p99(self):
+        return _percentile(self.samples, 99)
+
+    def as_dict(self):
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.mean * 1000,
+            "p50_ms": self.p50 * 1000,
+            "p99_ms": self.p99 * 1000,
+            "rows_returned": self.returned,
+            "rows_affected": self.affected,
+        }
+
+
+class DatabaseStats:
+    SORT_KEYS: t.Final = ("total", "count", "mean", "p50", "p99", "returned", "affected")
+
+    def __init__(self):
+        self.since = time()
+        self._queries: t.Dict[str, QueryStats] = {}
+        # Every call since boot; unlike the rest, this survives a reset.
+        self.total_calls = 0
+
+    def record(self, sql, elapsed, returned=0, affected=0):
+        self.total_calls += 1
+
+        if (stats := self._queries.get(sql)) is None:
+            # Statements are constant strings, so the raw text is only
+            # normalised the first time it is seen.
+            key = normalise(sql)
+            stats = self._queries.setdefault(sql, self._by_normalised(key))
+
+        stats.add(elapsed, returned, affected)
+
+    def _by_normalised(self, key):
+        for stats in self._queries.values():
+            if stats.sql == key:
+                return stats
+
+        return QueryStats(key)
+
+    @property
+    def calls(self):
+        return sum(s.count for s in self.queries)
+
+    @property
+    def queries(self):
+        return list({id(s): s for s in self._queries.values()}.values())
+
+    def top(self, sort="total", limit=None):
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"can not sort by {sort!r}")
+
+        return sorted(self.queries, key=lambda s: getattr(s, sort), reverse=True)[:limit]
+
+    def reset(self):
+        self.since = time()
+        self._queries.clear()
+
+    def as_dict(self):
+        return {
+            "since": self.since,
+            "calls": self.calls,
+            "queries": [s.as_dict() for s in self.top()],
+        }
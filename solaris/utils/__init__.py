@@ -42,7 +42,9 @@ SUPPORT_GUILD_INVITE_LINK = "https://discord.gg/c3b4cZs"
 # Dependant on constants above.
 from .embed import EmbedConstructor
 from .emoji import EmojiGetter
+from .gatemessages import GateMessageCache
+from .jobs import JobManager
 from .loc import CodeCounter
 from .presence import PresenceSetter
 from .ready import Ready
-from .search import Search
+from .search import Index, MemberSearch
@@ -0,0 +1,99 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import typing as t
+from asyncio import Semaphore, gather
+from time import perf_counter
+
+import discord
+
+# discord.py already queues requests per rate limit bucket and retries on
+# 429s, so this only needs to bound how many are waiting at once.
+DEFAULT_CONCURRENCY: t.Final = 8
+MAX_LISTED_FAILURES: t.Final = 10
+# Why acting on a member failed, by the error Discord returned. Anything
+# else being acted on needs its own wording.
+MEMBER_REASONS: t.Final = {
+    discord.Forbidden: "their permission set is superior to Solaris'",
+    discord.NotFound: "they no longer exist",
+}
+
+
+def _reason(ex, reasons):
+    for cls, reason in reasons.items():
+        if isinstance(ex, cls):
+            return reason
+
+    return f"Discord returned an error ({ex.status})"
+
+
+def _name(target):
+    return getattr(target, "display_name", str(target))
+
+
+class BulkResult:
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        return len(self.succeeded) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self, bot, done, none, failure):
+        # `done` is formatted with the success count, `failure` with the
+        # name of each failed target and the reason it failed.
+        if self.succeeded:
+            lines = [
+                f"{bot.tick} {done.format(count=len(self.succeeded))} "
+                f"(took {self.elapsed:,.2f}s; {self.throughput:,.1f}/s)."
+            ]
+        else:
+            lines = [f"{bot.cross} {none}"]
+
+        for target, reason in self.failed[:MAX_LISTED_FAILURES]:
+            lines.append(failure.format(target=_name(target), reason=reason))
+
+        if (extra := len(self.failed) - MAX_LISTED_FAILURES) > 0:
+            lines.append(f"...and {extra:,} more.")
+
+        return "\n".join(lines)
+
+
+async def run(action, targets, concurrency=DEFAULT_CONCURRENCY, reasons=MEMBER_REASONS):
+    # Runs `action` for each unique target, at most `concurrency` at a time.
+    # HTTP errors are collected rather than raised, described by `reasons`.
+    result = BulkResult()
+    semaphore = Semaphore(concurrency)
+
+    async def _run(target):
+        async with semaphore:
+            try:
+                await action(target)
+            except discord.HTTPException as ex:
+                result.failed.append((target, _reason(ex, reasons)))
+            else:
+                result.succeeded.append(target)
+
+    start = perf_counter()
+    await gather(*(_run(target) for target in dict.fromkeys(targets)))
+    result.elapsed = perf_counter() - start
+
+    return result
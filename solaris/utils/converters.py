@@ -22,8 +22,6 @@ import re
 import discord
 from discord.ext import commands
 
-from solaris.utils import Search
-
 
 class User(commands.Converter):
     async def convert(self, ctx, arg):
@@ -60,12 +58,7 @@ class Command(commands.Converter):
 
 class SearchedMember(commands.Converter):
     async def convert(self, ctx, arg):
-        if (
-            member := discord.utils.get(
-                ctx.guild.members,
-                name=str(Search(arg, [m.display_name for m in ctx.guild.members]).best(min_accuracy=0.75)),
-            )
-        ) is None:
+        if (member := await ctx.bot.member_search.best(ctx.guild, arg, min_strength=0.75)) is None:
             raise commands.BadArgument
         return member
 
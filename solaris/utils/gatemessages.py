@@ -0,0 +1,59 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+from asyncio import create_task, shield
+
+
+class GateMessageCache:
+    # Each guild's gate message, fetched once and kept until it is deleted or
+    # edited, so gateway events don't each cost a REST round trip.
+    def __init__(self, bot):
+        self.bot = bot
+        self._messages = {}
+        self._fetches = {}
+
+    async def get(self, channel, message_id, fresh=False):
+        # Raises the same errors as `fetch_message`.
+        guild_id = channel.guild.id
+
+        if not fresh and (message := self._messages.get(guild_id)) is not None and message.id == message_id:
+            return message
+
+        if (fetch := self._fetches.get(message_id)) is None:
+            # Concurrent lookups share a single request.
+            fetch = self._fetches[message_id] = create_task(channel.fetch_message(message_id))
+            fetch.add_done_callback(lambda f: self._done(message_id, f))
+
+        message = self._messages[guild_id] = await shield(fetch)
+        return message
+
+    def _done(self, message_id, fetch):
+        self._fetches.pop(message_id, None)
+
+        # Every caller sees the error itself; this only stops it being
+        # reported as never retrieved if they all gave up waiting.
+        if not fetch.cancelled():
+            fetch.exception()
+
+    def put(self, message):
+        self._messages[message.guild.id] = message
+
+    def discard(self, guild_id, message_id=None):
+        if message_id is None or getattr(self._messages.get(guild_id), "id", None) == message_id:
+            self._messages.pop(guild_id, None)
@@ -0,0 +1,97 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import typing as t
+from asyncio import gather
+from collections import Counter
+from time import monotonic
+
+# Seconds REST lookups are reused for.
+REST_TTL: t.Final = 60
+
+# name: (permission needed, coroutine function)
+LOOKUPS: t.Final = {
+    "bans": ("ban_members", lambda g: g.bans()),
+    "invites": ("manage_guild", lambda g: g.invites()),
+    "webhooks": ("manage_webhooks", lambda g: g.webhooks()),
+    "prune_1d": ("kick_members", lambda g: g.estimate_pruned_members(days=1)),
+    "prune_7d": ("kick_members", lambda g: g.estimate_pruned_members(days=7)),
+    "prune_30d": ("kick_members", lambda g: g.estimate_pruned_members(days=30)),
+}
+
+
+class MemberCounts:
+    __slots__ = ("humans", "bots", "statuses", "with_top_role", "newest")
+
+    def __init__(self, guild):
+        self.humans = 0
+        self.bots = 0
+        self.statuses = Counter()
+        self.with_top_role = 0
+        self.newest = None
+        top_role = guild.roles[-1]
+
+        # Everything is counted in a single pass over the member list.
+        for member in guild.members:
+            if member.bot:
+                self.bots += 1
+            else:
+                self.humans += 1
+
+            self.statuses[member.status] += 1
+
+            if top_role in member.roles:
+                self.with_top_role += 1
+
+            if self.newest is None or member.joined_at > self.newest.joined_at:
+                self.newest = member
+
+
+class GuildStats:
+    def __init__(self):
+        self._cache = {}
+
+    def members(self, guild):
+        return MemberCounts(guild)
+
+    async def fetch(self, guild, *names):
+        # Returns the size of each lookup, or None if Solaris is missing the
+        # permission for it. Lookups not already cached run concurrently.
+        now = monotonic()
+        results = {}
+        missing = []
+
+        for name in names:
+            permission, _ = LOOKUPS[name]
+
+            if not getattr(guild.me.guild_permissions, permission):
+                results[name] = None
+            elif (cached := self._cache.get((guild.id, name))) is not None and cached[0] > now:
+                results[name] = cached[1]
+            else:
+                missing.append(name)
+
+        for name, value in zip(missing, await gather(*(LOOKUPS[name][1](guild) for name in missing))):
+            if not isinstance(value, int):
+                value = len(value)
+
+            self._cache[(guild.id, name)] = (now + REST_TTL, value)
+            results[name] = value
+
+        return results
@@ -0,0 +1,169 @@
+# Solaris - A Discord bot designed to make your server a safer and better place.
+# Copyright (C) 2020  Ethan Henderson
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ethan Henderson
+# parafoxia@carberra.xyz
+
+import json
+import typing as t
+from abc import ABC, abstractmethod
+from asyncio import create_task
+from time import monotonic
+
+import discord
+
+from solaris.utils import bulk
+
+# Seconds between edits of a job's progress message.
+PROGRESS_INTERVAL: t.Final = 15
+
+
+class Job(ABC):
+    # A long-running per-guild job that works through a guild's members in
+    # ID order. The cursor (the ID of the last member processed) is saved
+    # after every batch, so after a restart the job carries on from there
+    # rather than starting again.
+    kind: t.ClassVar[str] = ""
+    batch_size: t.ClassVar[int] = 50
+
+    def __init__(self, bot, guild, channel_id, message_id=None, cursor=0, checked=0, changed=0, options=None):
+        self.bot = bot
+        self.guild = guild
+        self.channel_id = channel_id
+        self.message_id = message_id
+        # The progress message, once it has been fetched or sent.
+        self.message = None
+        self.cursor = cursor
+        self.checked = checked
+        self.changed = changed
+        self.options = options or {}
+        self.total = checked
+
+    @abstractmethod
+    def select(self, member):
+        # Whether the member needs actioning at all.
+        pass
+
+    @abstractmethod
+    async def action(self, member):
+        pass
+
+    @abstractmethod
+    def progress(self):
+        pass
+
+    @abstractmethod
+    def finished(self):
+        pass
+
+
+class JobManager:
+    def __init__(self, bot):
+        self.bot = bot
+        self._tasks = {}
+
+    def running(self, guild_id, kind):
+        return (guild_id, kind) in self._tasks
+
+    async def start(self, job):
+        await self.bot.db.q.add_job(
+            job.guild.id,
+            job.kind,
+            job.channel_id,
+            job.message_id,
+            job.cursor,
+            job.checked,
+            job.changed,
+            json.dumps(job.options),
+        )
+        self._spawn(job)
+
+    async def resume(self, cls):
+        for guild_id, channel_id, message_id, cursor, checked, changed, options in await self.bot.db.q.jobs_of_kind(
+            cls.kind
+        ):
+            if (guild := self.bot.get_guild(guild_id)) is None:
+                await self.bot.db.q.remove_job(guild_id, cls.kind)
+            elif not self.running(guild_id, cls.kind):
+                self._spawn(
+                    cls(self.bot, guild, channel_id, message_id, cursor, checked, changed, json.loads(options or "{}"))
+                )
+
+    def _spawn(self, job):
+        key = (job.guild.id, job.kind)
+        self._tasks[key] = task = create_task(self._reported(job))
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def _reported(self, job):
+        # A job that fails is reported like an event handler would be. Its
+        # row is kept, so it carries on from its last checkpoint after the
+        # next restart.
+        try:
+            await self._run(job)
+        except Exception:
+            try:
+                await self.bot.on_error("on_job")
+            except Exception:
+                pass
+
+    async def _run(self, job):
+        members = sorted((m for m in job.guild.members if m.id > job.cursor), key=lambda m: m.id)
+        job.total = job.checked + len(members)
+        reported = monotonic()
+
+        for i in range(0, len(members), job.batch_size):
+            batch = members[i : i + job.batch_size]
+            result = await bulk.run(job.action, filter(job.select, batch))
+
+            job.cursor = batch[-1].id
+            job.checked += len(batch)
+            job.changed += len(result.succeeded)
+
+            if monotonic() - reported >= PROGRESS_INTERVAL:
+                await self._report(job, job.progress())
+                reported = monotonic()
+
+            await self.bot.db.q.checkpoint_job(
+                job.message_id, job.cursor, job.checked, job.changed, job.guild.id, job.kind
+            )
+
+        await self.bot.db.q.remove_job(job.guild.id, job.kind)
+        await self._report(job, job.finished())
+
+    async def _report(self, job, text):
+        if (channel := self.bot.get_channel(job.channel_id)) is None:
+            return
+
+        # Progress reports are best effort; the job carries on whether or
+        # not they can be posted.
+        try:
+            if job.message is None and job.message_id is not None:
+                job.message = await channel.fetch_message(job.message_id)
+
+            if job.message is not None:
+                await job.message.edit(content=text)
+                return
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            return
+
+        # The progress message has gone (or was never sent), so post a new one.
+        try:
+            job.message = await channel.send(text)
+            job.message_id = job.message.id
+        except discord.HTTPException:
+            pass
@@ -38,8 +38,17 @@ MIN_STRIKES = 1
 MAX_STRIKES = 9
 
 
+def _template_error(text, variables):
+    # Templates are checked when they are set. Ones stored before this check
+    # existed can still be invalid, so rendering falls back to the default.
+    try:
+        string.Template(text, variables, strict=bool(variables))
+    except string.TemplateError as ex:
+        return ex
+
+
 async def _system__runfts(bot, channel, value):
-    await bot.db.execute("UPDATE system SET RunFTS = ? WHERE GuildID = ?", value, channel.guild.id)
+    await bot.db.settings.update(channel.guild.id, "system", run_fts=value)
 
 
 async def system__prefix(bot, channel, value):
@@ -52,7 +61,7 @@ async def system__prefix(bot, channel, value):
             f"{bot.cross} The server prefix must be no longer than {MAX_PREFIX_LEN} characters in length."
         )
     else:
-        await bot.db.execute("UPDATE system SET Prefix = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "system", prefix=value)
         await channel.send(f"{bot.tick} The server prefix has been set to {value}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The server prefix has been set to {value}.")
@@ -68,7 +77,7 @@ async def system__logchannel(bot, channel, value):
             f"{bot.cross} The given channel can not be used as the log channel as Solaris can not send messages to it."
         )
     else:
-        await bot.db.execute("UPDATE system SET LogChannelID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "system", log_channel_id=value.id)
         await channel.send(f"{bot.tick} The log channel has been set to {value.mention}.")
         await value.send(
             (
@@ -99,7 +108,7 @@ async def system__adminrole(bot, channel, value):
             f"{bot.cross} The given role can not be used as the admin role as it is above Solaris' top role in the role hierarchy."
         )
     else:
-        await bot.db.execute("UPDATE system SET AdminRoleID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "system", admin_role_id=value.id)
         await channel.send(f"{bot.tick} The admin role has been set to {value.mention}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The admin role has been set to {value.mention}.")
@@ -114,7 +123,7 @@ async def system__adminrole(bot, channel, value):
 
 
 async def _gateway__active(bot, channel, value):
-    await bot.db.execute("UPDATE gateway SET Active = ? WHERE GuildID = ?", value, channel.guild.id)
+    await bot.db.settings.update(channel.guild.id, "gateway", active=value)
 
 
 async def gateway__ruleschannel(bot, channel, value):
@@ -132,7 +141,7 @@ async def gateway__ruleschannel(bot, channel, value):
             f"{bot.cross} The given channel can not be used as the rules channel as Solaris can not send messages to it or manage exising messages there."
         )
     else:
-        await bot.db.execute("UPDATE gateway SET RulesChannelID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", rules_channel_id=value.id)
         await channel.send(
             f"{bot.tick} The rules channel has been set to {value.mention}. Make sure this is the first channel new members see when they join."
         )
@@ -142,9 +151,9 @@ async def gateway__ruleschannel(bot, channel, value):
 
 async def _gateway__gatemessage(bot, channel, value):
     if value is not None:
-        await bot.db.execute("UPDATE gateway SET GateMessageID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", gate_message_id=value.id)
     else:
-        await bot.db.execute("UPDATE gateway SET GateMessageID = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", gate_message_id=None)
 
 
 async def gateway__blockingrole(bot, channel, value):
@@ -163,7 +172,7 @@ async def gateway__blockingrole(bot, channel, value):
             f"{bot.cross} The given role can not be used as the blocking role as it is above Solaris' top role in the role hierarchy."
         )
     else:
-        await bot.db.execute("UPDATE gateway SET BlockingRoleID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", blocking_role_id=value.id)
         await channel.send(
             f"{bot.tick} The blocking role has been set to {value.mention}. Make sure the permissions are set correctly."
         )
@@ -179,7 +188,7 @@ async def gateway__memberroles(bot, channel, values):
     if (br := await retrieve.gateway__blockingrole(bot, channel.guild)) is None:
         await channel.send(f"{bot.cross} You need to set the blocking role before you can set the member roles.")
     elif values[0] is None:
-        await bot.db.execute("UPDATE gateway SET MemberRoleIDs = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.set_roles(channel.guild.id, "member", ())
         await channel.send(f"{bot.tick} The member roles have been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The member roles have been reset.")
@@ -198,11 +207,7 @@ async def gateway__memberroles(bot, channel, values):
             f"{bot.cross} One or more given roles can not be used as member roles as they are above Solaris' top role in the role hierarchy."
         )
     else:
-        await bot.db.execute(
-            "UPDATE gateway SET MemberRoleIDs = ? WHERE GuildID = ?",
-            ",".join(f"{v.id}" for v in values),
-            channel.guild.id,
-        )
+        await bot.db.settings.set_roles(channel.guild.id, "member", [v.id for v in values])
         await channel.send(
             f"{bot.tick} The member roles have been set to {string.list_of([v.mention for v in values])}. Make sure the permissions are set correctly."
         )
@@ -218,7 +223,7 @@ async def gateway__exceptionroles(bot, channel, values):
     if (br := await retrieve.gateway__blockingrole(bot, channel.guild)) is None:
         await channel.send(f"{bot.cross} You need to set the blocking role before you can set the exception roles.")
     elif values[0] is None:
-        await bot.db.execute("UPDATE gateway SET ExceptionRoleIDs = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.set_roles(channel.guild.id, "exception", ())
         await channel.send(f"{bot.tick} The exception roles have been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The exception roles have been reset.")
@@ -233,11 +238,7 @@ async def gateway__exceptionroles(bot, channel, values):
     elif any(v == br for v in values):
         await channel.send(f"{bot.cross} No exception roles can be the same as the blocking role.")
     else:
-        await bot.db.execute(
-            "UPDATE gateway SET ExceptionRoleIDs = ? WHERE GuildID = ?",
-            ",".join(f"{v.id}" for v in values),
-            channel.guild.id,
-        )
+        await bot.db.settings.set_roles(channel.guild.id, "exception", [v.id for v in values])
         await channel.send(
             f"{bot.tick} The exception roles have been set to {string.list_of([v.mention for v in values])}."
         )
@@ -253,7 +254,7 @@ async def gateway__welcomechannel(bot, channel, value):
     if (rc := await retrieve.gateway__ruleschannel(bot, channel.guild)) is None:
         await channel.send(f"{bot.cross} You need to set the rules channel before you can set the welcome channel.")
     elif value is None:
-        await bot.db.execute("UPDATE gateway SET WelcomeChannelID = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_channel_id=None)
         await channel.send(
             f"{bot.tick} The welcome channel has been reset. Solaris will stop sending welcome messages."
         )
@@ -268,7 +269,7 @@ async def gateway__welcomechannel(bot, channel, value):
             f"{bot.cross} The given channel can not be used as the welcome channel as Solaris can not send messages to it."
         )
     else:
-        await bot.db.execute("UPDATE gateway SET WelcomeChannelID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_channel_id=value.id)
         await channel.send(f"{bot.tick} The welcome channel has been set to {value.mention}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The welcome channel has been set to {value.mention}.")
@@ -280,7 +281,7 @@ async def gateway__goodbyechannel(bot, channel, value):
     if (rc := await retrieve.gateway__ruleschannel(bot, channel.guild)) is None:
         await channel.send(f"{bot.cross} You need to set the rules channel before you can set the goodbye channel.")
     elif value is None:
-        await bot.db.execute("UPDATE gateway SET GoodbyeChannelID = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_channel_id=None)
         await channel.send(
             f"{bot.tick} The goodbye channel has been reset. Solaris will stop sending goodbye messages."
         )
@@ -295,7 +296,7 @@ async def gateway__goodbyechannel(bot, channel, value):
             f"{bot.cross} The given channel can not be used as the goodbye channel as Solaris can not send messages to it."
         )
     else:
-        await bot.db.execute("UPDATE gateway SET GoodbyeChannelID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_channel_id=value.id)
         await channel.send(f"{bot.tick} The goodbye channel has been set to {value.mention}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The goodbye channel has been set to {value.mention}.")
@@ -305,7 +306,7 @@ async def gateway__timeout(bot, channel, value):
     """The gateway timeout
     The amount of time Solaris gives new members to react to the gate message before being kicked. This is set in minutes, and can be set to any value between 1 and 60 inclusive. If no timeout is set, the default is 5 minutes. This can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET Timeout = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", timeout=None)
         await channel.send(f"{bot.tick} The timeout has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The timeout has been reset.")
@@ -316,7 +317,7 @@ async def gateway__timeout(bot, channel, value):
             f"{bot.cross} The timeout must be between {MIN_TIMEOUT} and {MAX_TIMEOUT} minutes inclusive."
         )
     else:
-        await bot.db.execute("UPDATE gateway SET Timeout = ? WHERE GuildID = ?", value * 60, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", timeout=value * 60)
         await channel.send(
             f"{bot.tick} The timeout has been set to {value} minute(s). This will only apply to members who enter the server from now."
         )
@@ -328,7 +329,7 @@ async def gateway__gatetext(bot, channel, value):
     """The gate message text
     The message displayed in the gate message. The message can be up to 250 characters in length, and should **not** contain the server rules. If no message is set, a default will be used instead. The message can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET GateText = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", gate_text=None)
         await channel.send(
             f"{bot.tick} The gate message text has been reset. The module needs to be restarted for these changes to take effect."
         )
@@ -340,10 +341,10 @@ async def gateway__gatetext(bot, channel, value):
         await channel.send(
             f"{bot.cross} The gate message text must be no longer than {MAX_GATETEXT_LEN:,} characters in length."
         )
-    elif not string.text_is_formattible(value):
-        await channel.send(f"{bot.cross} The given message is not formattible (probably unclosed brace).")
+    elif (error := _template_error(value, {})) is not None:
+        await channel.send(f"{bot.cross} The given message is not formattible ({error}).")
     else:
-        await bot.db.execute("UPDATE gateway SET GateText = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", gate_text=value)
         await channel.send(
             f"{bot.tick} The gate message text has been set. The module needs to be restarted for these changes to take effect."
         )
@@ -355,7 +356,7 @@ async def gateway__welcometext(bot, channel, value):
     """The welcome message text
     The message sent to the welcome channel (if set) when a new member accepts the server rules. This message can be up to 1,000 characters in length. If no message is set, a default will be used instead. The message can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET WelcomeText = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_text=None)
         await channel.send(f"{bot.tick} The welcome message text has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The welcome message text has been reset.")
@@ -365,10 +366,10 @@ async def gateway__welcometext(bot, channel, value):
         await channel.send(
             f"{bot.cross} The welcome message text must be no longer than {MAX_WGTEXT_LEN:,} characters in length."
         )
-    elif not string.text_is_formattible(value):
-        await channel.send(f"{bot.cross} The given message is not formattible (probably unclosed brace).")
+    elif (error := _template_error(value, string.MEMBER_VARIABLES)) is not None:
+        await channel.send(f"{bot.cross} The given message is not formattible ({error}).")
     else:
-        await bot.db.execute("UPDATE gateway SET WelcomeText = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_text=value)
         await channel.send(f"{bot.tick} The welcome message text has been set.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The welcome message text has been set to the following: {value}")
@@ -378,7 +379,7 @@ async def gateway__goodbyetext(bot, channel, value):
     """The goodbye message text
     The message sent to the goodbye channel (if set) when a member leaves the server. This message can be up to 1,000 characters in length. If no message is set, a default will be used instead. The message can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET GoodbyeText = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_text=None)
         await channel.send(f"{bot.tick} The goodbye message text has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The goodbye message text has been reset.")
@@ -388,10 +389,10 @@ async def gateway__goodbyetext(bot, channel, value):
         await channel.send(
             f"{bot.cross} The goodbye message text must be no longer than {MAX_WGTEXT_LEN:,} characters in length."
         )
-    elif not string.text_is_formattible(value):
-        await channel.send(f"{bot.cross} The given message is not formattible (probably unclosed brace).")
+    elif (error := _template_error(value, string.MEMBER_VARIABLES)) is not None:
+        await channel.send(f"{bot.cross} The given message is not formattible ({error}).")
     else:
-        await bot.db.execute("UPDATE gateway SET GoodbyeText = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_text=value)
         await channel.send(f"{bot.tick} The goodbye message text has been set.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The goodbye message text has been set to the following: {value}")
@@ -401,7 +402,7 @@ async def gateway__welcomebottext(bot, channel, value):
     """The welcome message text for bots
     The message sent to the welcome channel (if set) when a bot joins the server. This message can be up to 500 characters in length. If no message is set, a default will be used instead. The message can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET WelcomeBotText = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_bot_text=None)
         await channel.send(f"{bot.tick} The welcome bot message text has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The welcome bot message text has been reset.")
@@ -411,10 +412,10 @@ async def gateway__welcomebottext(bot, channel, value):
         await channel.send(
             f"{bot.cross} The welcome bot message text must be no longer than {MAX_WGBOTTEXT_LEN:,} characters in length."
         )
-    elif not string.text_is_formattible(value):
-        await channel.send(f"{bot.cross} The given message is not formattible (probably unclosed brace).")
+    elif (error := _template_error(value, string.MEMBER_VARIABLES)) is not None:
+        await channel.send(f"{bot.cross} The given message is not formattible ({error}).")
     else:
-        await bot.db.execute("UPDATE gateway SET WelcomeBotText = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", welcome_bot_text=value)
         await channel.send(f"{bot.tick} The welcome bot message text has been set.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The welcome bot message text has been set to the following: {value}")
@@ -424,7 +425,7 @@ async def gateway__goodbyebottext(bot, channel, value):
     """The goodbye message text for bots
     The message sent to the goodbye channel (if set) when a bot leaves the server. This message can be up to 500 characters in length. If no message is set, a default will be used instead. The message can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE gateway SET GoodbyeBotText = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_bot_text=None)
         await channel.send(f"{bot.tick} The goodbye bot message text has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The goodbye bot message text has been reset.")
@@ -434,10 +435,10 @@ async def gateway__goodbyebottext(bot, channel, value):
         await channel.send(
             f"{bot.cross} The goodbye bot message text must be no longer than {MAX_WGBOTTEXT_LEN:,} characters in length."
         )
-    elif not string.text_is_formattible(value):
-        await channel.send(f"{bot.cross} The given message is not formattible (probably unclosed brace).")
+    elif (error := _template_error(value, string.MEMBER_VARIABLES)) is not None:
+        await channel.send(f"{bot.cross} The given message is not formattible ({error}).")
     else:
-        await bot.db.execute("UPDATE gateway SET GoodbyeBotText = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "gateway", goodbye_bot_text=value)
         await channel.send(f"{bot.tick} The goodbye bot message text has been set.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The goodbye bot message text has been set to the following: {value}")
@@ -447,7 +448,7 @@ async def warn__warnrole(bot, channel, value):
     """The warn role
     The role that members need to have in order to warn other members, typically a moderator or staff role. If this is not set, only server administrators will be able to warn members. This can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE warn SET WarnRoleID = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", warn_role_id=None)
         await channel.send(f"{bot.tick} The warn role has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The warn role has been reset.")
@@ -458,7 +459,7 @@ async def warn__warnrole(bot, channel, value):
     elif value.name == "@here":
         await channel.send(f"{bot.cross} The here role can not be used as the warn role.")
     else:
-        await bot.db.execute("UPDATE warn SET WarnRoleID = ? WHERE GuildID = ?", value.id, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", warn_role_id=value.id)
         await channel.send(f"{bot.tick} The warn role has been set to {value.mention}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The warn role has been set to {value.mention}.")
@@ -468,7 +469,7 @@ async def warn__maxpoints(bot, channel, value):
     """The max points total
     The number of points a member needs in total to get banned from a warning. This can be set to any value between 5 and 99 inclusive. If no value is set, the default is 12. This can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE warn SET MaxPoints = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", max_points=None)
         await channel.send(f"{bot.tick} The max points total has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The max points total has been reset.")
@@ -479,7 +480,7 @@ async def warn__maxpoints(bot, channel, value):
             f"{bot.cross} The max points total must be between {MIN_POINTS} and {MAX_POINTS} inclusive."
         )
     else:
-        await bot.db.execute("UPDATE warn SET MaxPoints = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", max_points=value)
         await channel.send(
             f"{bot.tick} The max points total has been set to {value}. Members currently at or exceeding this total will not be retroactively banned."
         )
@@ -491,7 +492,7 @@ async def warn__maxstrikes(bot, channel, value):
     """The max strikes per offence
     The number of times a member needs to be warned of a particular offence to get banned from a warning. This is per offence, and not a total number of strikes. This can be set to any value between 1 and 9 inclusive. If no value is set, the default is 3. This can be reset at any time by passing no arguments to the command below."""
     if value is None:
-        await bot.db.execute("UPDATE warn SET MaxStrikes = NULL WHERE GuildID = ?", channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", max_strikes=None)
         await channel.send(f"{bot.tick} The max strikes per offence has been reset.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The max strikes per offence has been reset.")
@@ -502,7 +503,7 @@ async def warn__maxstrikes(bot, channel, value):
             f"{bot.cross} The max strikes per offence must be between {MIN_STRIKES} and {MAX_STRIKES} inclusive."
         )
     else:
-        await bot.db.execute("UPDATE warn SET MaxStrikes = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", max_strikes=value)
         await channel.send(
             f"{bot.tick} The max strikes per offence has been set to {value}. Members currently at or exceeding this total will not be retroactively banned."
         )
@@ -518,7 +519,7 @@ async def warn__retroupdates(bot, channel, value):
     elif not 0 <= value <= 1:
         await channel.send(f"{bot.cross} The retroactive updates toggle must be either 0 or 1.")
     else:
-        await bot.db.execute("UPDATE warn SET RetroUpdates = ? WHERE GuildID = ?", value, channel.guild.id)
+        await bot.db.settings.update(channel.guild.id, "warn", retro_updates=value)
         await channel.send(f"{bot.tick} The retroactive updates toggle has been set to {value}.")
         lc = await retrieve.log_channel(bot, channel.guild)
         await lc.send(f"{bot.info} The retroactive updates toggle has been set to {value}.")
@@ -24,23 +24,21 @@ from solaris.utils.modules import retrieve
 
 async def gateway(ctx):
     async with ctx.typing():
-        active, rc_id, gm_id = await ctx.bot.db.record(
-            "SELECT Active, RulesChannelID, GateMessageID FROM gateway WHERE GuildID = ?", ctx.guild.id
-        )
+        gateway = (await ctx.bot.db.settings.get(ctx.guild.id)).gateway
 
-        if not active:
+        if not gateway.active:
             await ctx.send(f"{ctx.bot.cross} The gateway module is already inactive.")
         else:
             try:
-                gm = await ctx.bot.get_channel(rc_id).fetch_message(gm_id)
+                gm = await ctx.bot.gate_messages.get(
+                    ctx.bot.get_channel(gateway.rules_channel_id), gateway.gate_message_id
+                )
                 await gm.delete()
             except (discord.NotFound, discord.Forbidden, AttributeError):
                 pass
 
-            await ctx.bot.db.execute("DELETE FROM entrants WHERE GuildID = ?", ctx.guild.id)
-            await ctx.bot.db.execute(
-                "UPDATE gateway SET Active = 0, GateMessageID = NULL WHERE GuildID = ?", ctx.guild.id
-            )
+            await ctx.bot.db.q.clear_entrants(ctx.guild.id)
+            await ctx.bot.db.settings.update(ctx.guild.id, "gateway", active=0, gate_message_id=None)
 
             await ctx.send(f"{ctx.bot.tick} The gateway module has been deactivated.")
             lc = await retrieve.log_channel(ctx.bot, ctx.guild)
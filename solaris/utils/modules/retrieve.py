@@ -20,20 +20,24 @@
 import discord
 
 
+async def _settings(bot, guild):
+    return await bot.db.settings.get(guild.id)
+
+
 async def _system__runfts(bot, guild):
-    return await bot.db.field("SELECT RunFTS FROM system WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).system.run_fts
 
 
 async def system__prefix(bot, guild):
-    return await bot.db.field("SELECT Prefix FROM system WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).system.prefix
 
 
 async def system__defaultlogchannel(bot, guild):
-    return bot.get_channel(await bot.db.field("SELECT DefaultLogChannelID FROM system WHERE GuildID = ?", guild.id))
+    return bot.get_channel((await _settings(bot, guild)).system.default_log_channel_id)
 
 
 async def system__logchannel(bot, guild):
-    return bot.get_channel(await bot.db.field("SELECT LogChannelID FROM system WHERE GuildID = ?", guild.id))
+    return bot.get_channel((await _settings(bot, guild)).system.log_channel_id)
 
 
 async def log_channel(bot, guild):
@@ -42,92 +46,84 @@ async def log_channel(bot, guild):
 
 
 async def system__defaultadminrole(bot, guild):
-    return guild.get_role(await bot.db.field("SELECT DefaultAdminRoleID FROM system WHERE GuildID = ?", guild.id))
+    return guild.get_role((await _settings(bot, guild)).system.default_admin_role_id)
 
 
 async def system__adminrole(bot, guild):
-    return guild.get_role(await bot.db.field("SELECT AdminRoleID FROM system WHERE GuildID = ?", guild.id))
+    return guild.get_role((await _settings(bot, guild)).system.admin_role_id)
 
 
 async def _gateway__active(bot, guild):
-    return bool(await bot.db.field("SELECT Active FROM gateway WHERE GuildID = ?", guild.id))
+    return bool((await _settings(bot, guild)).gateway.active)
 
 
 async def gateway__ruleschannel(bot, guild):
-    return bot.get_channel(await bot.db.field("SELECT RulesChannelID FROM gateway WHERE GuildID = ?", guild.id))
+    return bot.get_channel((await _settings(bot, guild)).gateway.rules_channel_id)
 
 
 async def _gateway__gatemessage(bot, guild):
     try:
-        rc_id, gm_id = await bot.db.record(
-            "SELECT RulesChannelID, GateMessageID FROM gateway WHERE GuildID = ?", guild.id
-        )
-        return await bot.get_channel(rc_id).fetch_message(gm_id)
+        gateway = (await _settings(bot, guild)).gateway
+        return await bot.gate_messages.get(bot.get_channel(gateway.rules_channel_id), gateway.gate_message_id)
     except discord.NotFound:
         return None
 
 
 async def gateway__blockingrole(bot, guild):
-    return guild.get_role(await bot.db.field("SELECT BlockingRoleID FROM gateway WHERE GuildID = ?", guild.id))
+    return guild.get_role((await _settings(bot, guild)).gateway.blocking_role_id)
 
 
 async def gateway__memberroles(bot, guild):
-    if ids := await bot.db.field("SELECT MemberRoleIDs FROM gateway WHERE GuildID = ?", guild.id):
-        return [guild.get_role(int(id_)) for id_ in ids.split(",")]
-    else:
-        return []
+    return [guild.get_role(id_) for id_ in (await _settings(bot, guild)).gateway.member_role_ids]
 
 
 async def gateway__exceptionroles(bot, guild):
-    if ids := await bot.db.field("SELECT ExceptionRoleIDs FROM gateway WHERE GuildID = ?", guild.id):
-        return [guild.get_role(int(id_)) for id_ in ids.split(",")]
-    else:
-        return []
+    return [guild.get_role(id_) for id_ in (await _settings(bot, guild)).gateway.exception_role_ids]
 
 
 async def gateway__welcomechannel(bot, guild):
-    return bot.get_channel(await bot.db.field("SELECT WelcomeChannelID FROM gateway WHERE GuildID = ?", guild.id))
+    return bot.get_channel((await _settings(bot, guild)).gateway.welcome_channel_id)
 
 
 async def gateway__goodbyechannel(bot, guild):
-    return bot.get_channel(await bot.db.field("SELECT GoodbyeChannelID FROM gateway WHERE GuildID = ?", guild.id))
+    return bot.get_channel((await _settings(bot, guild)).gateway.goodbye_channel_id)
 
 
 async def gateway__timeout(bot, guild):
-    return await bot.db.field("SELECT Timeout FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.timeout
 
 
 async def gateway__gatetext(bot, guild):
-    return await bot.db.field("SELECT GateText FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.gate_text
 
 
 async def gateway__welcometext(bot, guild):
-    return await bot.db.field("SELECT WelcomeText FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.welcome_text
 
 
 async def gateway__goodbyetext(bot, guild):
-    return await bot.db.field("SELECT GoodbyeText FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.goodbye_text
 
 
 async def gateway__welcomebottext(bot, guild):
-    return await bot.db.field("SELECT WelcomeBotText FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.welcome_bot_text
 
 
 async def gateway__goodbyebottext(bot, guild):
-    return await bot.db.field("SELECT GoodbyeBotText FROM gateway WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).gateway.goodbye_bot_text
 
 
 async def warn__warnrole(bot, guild):
-    return guild.get_role(await bot.db.field("SELECT WarnRoleID FROM warn WHERE GuildID = ?", guild.id))
+    return guild.get_role((await _settings(bot, guild)).warn.warn_role_id)
 
 
 async def warn__maxpoints(bot, guild):
-    return await bot.db.field("SELECT MaxPoints FROM warn WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).warn.max_points
 
 
 async def warn__maxstrikes(bot, guild):
-    return await bot.db.field("SELECT MaxStrikes FROM warn WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).warn.max_strikes
 
 
 async def warn__retroupdates(bot, guild):
-    return await bot.db.field("SELECT RetroUpdates FROM warn WHERE GuildID = ?", guild.id)
+    return (await _settings(bot, guild)).warn.retro_updates
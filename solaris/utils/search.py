@@ -18,96 +18,270 @@
 # parafoxia@carberra.xyz
 
 
-class Match:
-    def __init__(self, term, comparison, case_sensitive=False):
-        self.term = term
-        self.comparison = comparison
-        self.case_sensitive = case_sensitive
-        self._strength = self._calculate_strength()
+import typing as t
+from asyncio import create_task, get_running_loop, sleep
+from collections import defaultdict
+from heapq import nlargest
 
-    @property
-    def strength(self):
-        return self._strength
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-    def _calculate_strength(self):
-        most_matches = 0
+# The most candidates the trigram index scores itself. A term common
+# enough to share a trigram with more than this narrows nothing down.
+SHORTLIST_SIZE: t.Final = 500
+# Below this many candidates NumPy's overhead outweighs what it saves.
+BATCH_THRESHOLD: t.Final = 256
+# How many members are indexed before the event loop gets a turn.
+BUILD_CHUNK_SIZE: t.Final = 2000
 
-        for idx in range(len(self.comparison)):
-            matches = 0
-            term = self.term if self.case_sensitive else self.term.lower()
-            comparison = (self.comparison if self.case_sensitive else self.comparison.lower())[idx:]
 
-            for idx2 in range(min(len(term), len(comparison))):
-                if term[idx2] == comparison[idx2]:
-                    matches += 1
+def trigrams(text):
+    # Padded at the front only, so prefixes and very short terms still
+    # produce something to look up.
+    padded = f"  {text.lower()}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
 
-            if matches > most_matches:
-                most_matches = matches
 
-        return most_matches / len(self.term)
+def ceiling(term):
+    # The best strength a string sharing no trigram with the term can reach.
+    # Every alignment of it mismatches at least one character in three.
+    return (len(term) - len(term) // 3) / len(term)
 
-    def __str__(self, /):
-        return self.comparison
 
-    def __repr__(self, /):
-        return f"<Match comparison={repr(self.comparison)} strength={repr(self.strength)}>"
+def strength(term, comparison):
+    # The fraction of the term that matches the comparison at the best
+    # alignment. Both are expected to be lower case already.
+    best = 0
 
-    def __int__(self, /):
-        return int(self.strength)
+    for offset in range(len(comparison)):
+        if (matches := sum(a == b for a, b in zip(term, comparison[offset:]))) > best:
+            if (best := matches) == len(term):
+                break
+
+    return best / len(term)
 
-    def __round__(self, /):
-        return round(self.strength)
 
-    def __float__(self, /):
-        return self.strength
+def _batch_strengths(term, comparisons):
+    # Every comparison becomes a row of code points, padded with NULs so one
+    # slice per term character lines up every alignment of every row at once.
+    width = max(map(len, comparisons))
+    padded = "".join(c.ljust(width + len(term), "\0") for c in comparisons)
+    matrix = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32).reshape(len(comparisons), -1)
+    codes = np.frombuffer(term.encode("utf-32-le"), dtype=np.uint32)
+
+    matches = np.zeros((len(comparisons), width), dtype=np.uint16)
+    for i, code in enumerate(codes):
+        matches += matrix[:, i : i + width] == code
+
+    return matches.max(axis=1) / len(term), width
+
+
+def rank(term, comparisons, limit=1, min_strength=0.0):
+    # Scores a batch of lower case comparisons against the term, returning
+    # (position, strength) pairs for the best of them. Shorter comparisons
+    # win ties.
+    if not term or not comparisons:
+        return []
 
-    def __eq__(self, value, /):
-        return self.comparison == value.comparison
+    if np is None or len(comparisons) < BATCH_THRESHOLD:
+        scored = ((i, strength(term, c)) for i, c in enumerate(comparisons))
+        return nlargest(
+            limit,
+            ((i, s) for i, s in scored if s >= min_strength),
+            key=lambda r: (r[1], -len(comparisons[r[0]])),
+        )
 
-    def __ne__(self, value, /):
-        return self.comparison != value.comparison
+    strengths, width = _batch_strengths(term, comparisons)
+    # Strengths are multiples of 1 / len(term), so the length penalty can
+    # never carry a comparison past one with a higher strength.
+    keys = strengths - np.fromiter(map(len, comparisons), dtype=float) / ((width + 1) * len(term))
+    keys[strengths < min_strength] = -np.inf
 
+    if limit < len(keys):
+        top = np.argpartition(-keys, limit - 1)[:limit]
+    else:
+        top = np.arange(len(keys))
+
+    return [(int(i), float(strengths[i])) for i in top[np.argsort(-keys[top])] if keys[i] > -np.inf]
+
+
+def scan(term, keys, texts, limit=1, min_strength=0.0):
+    # Scores every text. Safe to run in a worker thread, as it only touches
+    # the lists it is given.
+    ranked = rank(term, [text.lower() for text in texts], limit, min_strength)
+    return [Result(keys[i], texts[i], s) for i, s in ranked]
+
+
+class Result:
+    __slots__ = ("key", "text", "strength")
+
+    def __init__(self, key, text, strength):
+        self.key = key
+        self.text = text
+        self.strength = strength
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"<Result key={self.key!r} text={self.text!r} strength={self.strength!r}>"
+
+
+class Index:
+    # An inverted trigram index. A search first scores the strings sharing
+    # a trigram with the term, and only scores every string if something
+    # outside that shortlist could still make the results.
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._texts = {}
 
-class Search:
-    def __init__(self, term, comparisons, case_sensitive=False):
-        self.term = term
-        self.comparisons = comparisons
-        self._matches = [Match(term, c, case_sensitive) for c in comparisons]
+    def add(self, key, text):
+        if key in self._texts:
+            self.remove(key)
 
-    @property
-    def matches(self):
-        return self._matches
+        self._texts[key] = (text, text.lower())
+        for gram in trigrams(text):
+            self._postings[gram].add(key)
+
+    def remove(self, key):
+        if (texts := self._texts.pop(key, None)) is None:
+            return
+
+        for gram in trigrams(texts[0]):
+            if (keys := self._postings.get(gram)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def search(self, term, limit=1, min_strength=0.0):
+        if not term:
+            return []
+
+        term = term.lower()
+        if (results := self.shortlisted(term, limit, min_strength)) is None:
+            results = scan(term, *self.snapshot(), limit, min_strength)
+
+        return results
+
+    def shortlisted(self, term, limit=1, min_strength=0.0):
+        # Scores only the strings sharing one of the term's own (unpadded)
+        # trigrams. Anything else is capped at `ceiling(term)`, so the
+        # results stand if they all beat it, or if nothing that low was
+        # wanted anyway. Otherwise this returns None, and every string
+        # needs scoring instead.
+        keys = set()
+        for gram in {term[i : i + 3] for i in range(len(term) - 2)}:
+            keys.update(self._postings.get(gram, ()))
+
+            if len(keys) > SHORTLIST_SIZE:
+                return None
+
+        keys = list(keys)
+        ranked = rank(term, [self._texts[key][1] for key in keys], limit, min_strength)
+        cap = ceiling(term)
+
+        if min_strength > cap or (len(ranked) == limit and ranked[-1][1] > cap):
+            return [Result(keys[i], self._texts[keys[i]][0], s) for i, s in ranked]
+
+    def snapshot(self):
+        keys = list(self._texts)
+        return keys, [self._texts[key][0] for key in keys]
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    def __len__(self):
+        return len(self._texts)
+
+
+class MemberSearch:
+    # One index of display names per guild. Each is built in the background
+    # the first time the guild is searched, then kept up to date from member
+    # events.
+    def __init__(self, bot):
+        self.bot = bot
+        self._indexes = {}
+        self._building = {}
+        self._builds = {}
+
+    async def _build(self, guild):
+        index = self._building[guild.id] = Index()
+        members = guild.members
+
+        try:
+            for i in range(0, len(members), BUILD_CHUNK_SIZE):
+                for member in members[i : i + BUILD_CHUNK_SIZE]:
+                    # Anyone who left while the index was being built has
+                    # already been dealt with.
+                    if guild.get_member(member.id) is not None:
+                        index.add(member.id, member.display_name)
+
+                # Give the event loop a turn between chunks.
+                await sleep(0)
+
+            self._indexes[guild.id] = index
+        finally:
+            self._building.pop(guild.id, None)
+            self._builds.pop(guild.id, None)
+
+    def _live(self, guild_id):
+        if (index := self._indexes.get(guild_id)) is not None:
+            return index
+
+        return self._building.get(guild_id)
+
+    def add(self, member):
+        if (index := self._live(member.guild.id)) is not None:
+            index.add(member.id, member.display_name)
+
+    def remove(self, member):
+        if (index := self._live(member.guild.id)) is not None:
+            index.remove(member.id)
+
+    def update(self, before, after):
+        if before.display_name != after.display_name:
+            self.add(after)
+
+    def update_user(self, before, after):
+        # Username changes come through as user updates, and only matter
+        # where the member has no nickname.
+        if before.name != after.name:
+            for guild_id in [*self._indexes, *self._building]:
+                if (guild := self.bot.get_guild(guild_id)) and (member := guild.get_member(after.id)):
+                    self.add(member)
+
+    def drop(self, guild_id):
+        self._indexes.pop(guild_id, None)
+
+        if (task := self._builds.pop(guild_id, None)) is not None:
+            task.cancel()
+
+    async def search(self, guild, term, limit=1, min_strength=0.0):
+        if not term:
+            return []
+
+        term = term.lower()
+
+        if (index := self._indexes.get(guild.id)) is None:
+            # Until the index is built, every member is scored.
+            if guild.id not in self._builds:
+                self._builds[guild.id] = create_task(self._build(guild))
+
+            keys, texts = [m.id for m in guild.members], [m.display_name for m in guild.members]
+            results = None
+        else:
+            results = index.shortlisted(term, limit, min_strength)
+            keys, texts = index.snapshot() if results is None else ((), ())
 
-    def best(self, min_accuracy=0):
-        if (match := max(self.matches, key=lambda x: x.strength)).strength >= min_accuracy:
-            return match
-
-    def worst(self):
-        return min(self.matches, key=lambda x: x.strength)
-
-    def top(self, limit=1):
-        return sorted(self.matches, key=lambda x: x.strength, reverse=True)[:limit]
-
-    def bottom(self, limit=1):
-        return sorted(self.matches, key=lambda x: x.strength, reverse=True)[-limit:]
-
-    def range(self, min, max):
-        return sorted(self.matches, key=lambda x: x.strength, reverse=True)[min:max]
-
-    def accurate_to(self, accuracy):
-        return sorted([m for m in self.matches if m.strength >= accuracy], key=lambda x: x.strength, reverse=True)
-
-    def __str__(self, /):
-        return self.term
-
-    def __repr__(self, /):
-        return f"<Search term={repr(self.term)} comparisons={repr(len(self.comparisons))}>"
-
-    def __int__(self, /):
-        return int(self.matches)
-
-    def __round__(self, /):
-        return round(self.matches)
-
-    def __float__(self, /):
-        return self.matches
+        if results is None:
+            # Scoring a large guild takes long enough without NumPy that it
+            # is done in a worker thread, off the event loop.
+            results = await get_running_loop().run_in_executor(None, scan, term, keys, texts, limit, min_strength)
+
+        return [member for result in results if (member := guild.get_member(result.key)) is not None]
+
+    async def best(self, guild, term, min_strength=0.0):
+        if members := await self.search(guild, term, 1, min_strength):
+            return members[0]
@@ -20,29 +20,112 @@
 from string import Formatter
 
 ORDINAL_ENDINGS = {"1": "st", "2": "nd", "3": "rd"}
+BAD_VARIABLE = "<BAD_VARIABLE>"
+
+# The variables custom gateway messages can use. Each is only worked out if
+# the template actually uses it; `bots` returns the guild's bot count.
+MEMBER_VARIABLES = {
+    "membername": lambda member, bots: member.name,
+    "username": lambda member, bots: member.name,
+    "membermention": lambda member, bots: member.mention,
+    "usermention": lambda member, bots: member.mention,
+    "memberstr": lambda member, bots: str(member),
+    "userstr": lambda member, bots: str(member),
+    "memberid": lambda member, bots: member.id,
+    "userid": lambda member, bots: member.id,
+    "servername": lambda member, bots: member.guild.name,
+    "guildname": lambda member, bots: member.guild.name,
+    "serverid": lambda member, bots: member.guild.id,
+    "guildid": lambda member, bots: member.guild.id,
+    "membercount": lambda member, bots: member.guild.member_count,
+    "ordmembercount": lambda member, bots: ordinal(member.guild.member_count),
+    "humancount": lambda member, bots: member.guild.member_count - bots(),
+    "ordhumancount": lambda member, bots: ordinal(member.guild.member_count - bots()),
+    "botcount": lambda member, bots: bots(),
+    "ordbotcount": lambda member, bots: ordinal(bots()),
+}
+
+_CONVERSIONS = {None: lambda v: v, "s": str, "r": repr, "a": ascii}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Template:
+    # A message template parsed once up front. Rendering only looks up the
+    # variables the template references.
+    __slots__ = ("text", "variables", "_parts")
+
+    def __init__(self, text, variables, strict=False):
+        self.text = text
+        names = set()
+        parts = []
+
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as ex:
+            raise TemplateError(str(ex)) from None
+
+        for literal, field, spec, conversion in parsed:
+            if field is None:
+                parts.append((literal, None, None, None))
+                continue
+
+            if not field.isidentifier():
+                raise TemplateError(f"{{{field}}} is not a valid variable")
+            if conversion not in _CONVERSIONS:
+                raise TemplateError(f"!{conversion} is not a valid conversion")
+            if "{" in spec:
+                raise TemplateError("variables can not be nested")
+            if strict and field not in variables:
+                raise TemplateError(f"{{{field}}} is not a recognised variable")
+
+            names.add(field)
+            parts.append((literal, variables.get(field), _CONVERSIONS[conversion], spec))
+
+        self.variables = frozenset(names)
+        self._parts = tuple(parts)
+
+    def render(self, *args):
+        # `args` are passed to each variable's function.
+        out = []
+
+        for literal, resolve, convert, spec in self._parts:
+            out.append(literal)
+
+            if convert is None:
+                continue
+
+            if resolve is None:
+                out.append(BAD_VARIABLE)
+                continue
+
+            value = convert(resolve(*args))
+            try:
+                out.append(format(value, spec))
+            except ValueError:
+                out.append(str(value))
 
+        return "".join(out)
 
-class MessageFormatter(Formatter):
-    def get_value(self, key, args, kwargs):
-        if isinstance(key, str):
-            try:
-                return kwargs[key]
-            except KeyError:
-                return "<BAD_VARIABLE>"
-        else:
-            return super().get_value(key, args, kwargs)
 
+class TemplateCache:
+    # Compiled templates per guild and setting. A template is only compiled
+    # again once the guild's text for it changes.
+    def __init__(self, variables):
+        self.variables = variables
+        self._templates = {}
 
-def safe_format(text, *args, **kwargs):
-    formatter = MessageFormatter()
-    return formatter.format(text, *args, **kwargs)
+    def get(self, guild_id, name, text):
+        if (template := self._templates.get((guild_id, name))) is None or template.text != text:
+            template = self._templates[(guild_id, name)] = Template(text, self.variables)
 
+        return template
 
-def text_is_formattible(text):
-    try:
-        return safe_format(text)
-    except:
-        return False
+    def drop(self, guild_id):
+        for key in [k for k in self._templates.keys() if k[0] == guild_id]:
+            del self._templates[key]
 
 
 def list_of(items, sep="and"):
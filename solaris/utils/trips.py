@@ -23,22 +23,19 @@ from solaris.utils.modules import retrieve
 
 
 async def gateway(okay, reason):
-    rc_id, gm_id = (
-        await okay.bot.db.record("SELECT RulesChannelID, GateMessageID FROM gateway WHERE GuildID = ?", okay.guild.id,)
-        or [None] * 2
-    )
+    gateway = (await okay.bot.db.settings.get(okay.guild.id)).gateway
     lc = await retrieve.log_channel(okay.bot, okay.guild)
 
     try:
-        if (rc := okay.bot.get_channel(rc_id)) is not None:
-            gm = await rc.fetch_message(gm_id)
+        if (rc := okay.bot.get_channel(gateway.rules_channel_id)) is not None:
+            gm = await okay.bot.gate_messages.get(rc, gateway.gate_message_id)
             await gm.delete()
             await lc.send(f"{okay.bot.info} The gate message was deleted.")
     except (discord.NotFound, discord.Forbidden):
         pass
 
-    await okay.bot.db.execute("DELETE FROM entrants WHERE GuildID = ?", okay.guild.id)
-    await okay.bot.db.execute("UPDATE gateway SET Active = 0, GateMessageID = NULL WHERE GuildID = ?", okay.guild.id)
+    await okay.bot.db.q.clear_entrants(okay.guild.id)
+    await okay.bot.db.settings.update(okay.guild.id, "gateway", active=0, gate_message_id=None)
     await lc.send(
         f"{okay.bot.cross} The gateway module tripped because {reason}. You will need to fix the problem and re-activate the module to use it again."
     )